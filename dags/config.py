@@ -7,10 +7,80 @@ YFINANCE_TABLE = "PRICE_HISTORY"
 # Default chunk size for Snowflake writes
 CHUNK_SIZE = 10000
 
+# "write_pandas"; "copy_into" to stage compressed Parquet files and bulk load them with COPY INTO;
+# or "merge" to COPY into a transient staging table and upsert on (TICKER, DATE)
+LOAD_MODE = "merge"
+
+# Keep fetched histories as Arrow tables and write Parquet straight from them (needs copy_into or merge)
+ARROW_NATIVE_LOAD = True
+
+# Stream fetched frames to Snowflake on a background writer while fetching continues
+STREAMING_LOAD = True
+
+# Flush buffered rows to Snowflake once any limit is reached (None disables a limit)
+FLUSH_MAX_ROWS = 250_000
+FLUSH_MAX_BYTES = 256 * 1024 ** 2
+FLUSH_MAX_SECONDS = 300
+
+# Number of mapped extract/load task instances the ticker universe is split into
+TICKER_SHARDS = 8
+
+# Optional Airflow pool capping how many shards run at once (None uses the default pool)
+FETCH_POOL = None
+
+# Number of tickers fetched concurrently by the extract/load task
+FETCH_MAX_WORKERS = 8
+
+# Persisted negative cache (one file per shard) of tickers that return no data or fail; None disables
+TICKER_QUARANTINE_DIR = "/tmp/yfinance_quarantine"
+
+# Directory where yfinance persists its timezone and cookie/crumb caches between runs
+YFINANCE_CACHE_DIR = "/tmp/yfinance_http_cache"
+
+# Adaptive rate limit (requests/second) shared by all Yahoo requests in a run
+FETCH_RATE_LIMIT_INITIAL = 5.0
+FETCH_RATE_LIMIT_MAX = 20.0
+
+# Per-ticker retries with exponential backoff, and the upstream error rate that aborts the run
+FETCH_MAX_ATTEMPTS = 3
+FETCH_RETRY_BASE_DELAY_SECONDS = 2.0
+FETCH_CIRCUIT_BREAKER_ERROR_RATE = 0.5
+
+# Fetch only dates after each ticker's latest loaded DATE; tickers with no history get a full backfill
+INCREMENTAL_LOAD = True
+
+# Long (backfill) ranges are split into up to this many date windows fetched in parallel per ticker
+BACKFILL_DATE_WINDOWS = 4
+
+# Local Parquet cache for fetched histories so task retries and reruns skip re-downloading (None disables)
+FETCH_CACHE_DIR = "/tmp/yfinance_cache"
+FETCH_CACHE_TTL_SECONDS = 12 * 60 * 60
+FETCH_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
 # Date range for fetching historical data
 START_DATE = "2000-01-01"
 END_DATE = "2025-04-15"
 
+# Per-shard checkpoints of committed tickers, so task retries resume instead of starting over
+# (must be on storage shared by all workers if retries can land on another host)
+LOAD_CHECKPOINT_DIR = "/tmp/yfinance_checkpoints"
+
+# Optional extra log file for the loader; its logs always go through a background queue listener
+LOADER_LOG_FILE = None
+
+# Load metrics backend: None, "memory" (timing summary printed in the task log) or "statsd"
+METRICS_BACKEND = None
+STATSD_HOST = "localhost"
+STATSD_PORT = 8125
+
+# Directory for per-shard span traces (Chrome trace format, open in Perfetto); None disables tracing
+TRACE_DIR = None
+
+# Wrap each load task in cProfile and tracemalloc; stats and top allocation sites are written next
+# to the task log, or under PROFILE_DIR if set
+PROFILE_TASK = False
+PROFILE_DIR = None
+
 # List of ticker symbols
 TICKER_SYMBOLS = [
     "AAL",
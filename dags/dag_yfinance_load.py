@@ -2,17 +2,46 @@ from __future__ import annotations
 
 import pendulum
 import base64, os
+from contextlib import nullcontext
 from pathlib import Path
 from airflow.decorators import dag, task
 from airflow.operators.empty import EmptyOperator
 from airflow.providers.snowflake.operators.snowflake import SnowflakeSqlApiOperator
-from src.yfinance_loader import fetch_and_load_stock_data  # Import our function
-from dags import (
+from dags.config import (
     TICKER_SYMBOLS,
     SF_CONN,
     SF_DB,
     SF_SCHEMA,
-    YFINANCE_TABLE
+    YFINANCE_TABLE,
+    TICKER_SHARDS,
+    FETCH_POOL,
+    LOAD_MODE,
+    ARROW_NATIVE_LOAD,
+    STREAMING_LOAD,
+    FLUSH_MAX_ROWS,
+    FLUSH_MAX_BYTES,
+    FLUSH_MAX_SECONDS,
+    FETCH_MAX_WORKERS,
+    FETCH_RATE_LIMIT_INITIAL,
+    FETCH_RATE_LIMIT_MAX,
+    FETCH_MAX_ATTEMPTS,
+    FETCH_RETRY_BASE_DELAY_SECONDS,
+    FETCH_CIRCUIT_BREAKER_ERROR_RATE,
+    INCREMENTAL_LOAD,
+    BACKFILL_DATE_WINDOWS,
+    FETCH_CACHE_DIR,
+    FETCH_CACHE_TTL_SECONDS,
+    FETCH_CACHE_MAX_BYTES,
+    YFINANCE_CACHE_DIR,
+    TICKER_QUARANTINE_DIR,
+    LOAD_CHECKPOINT_DIR,
+    LOADER_LOG_FILE,
+    METRICS_BACKEND,
+    STATSD_HOST,
+    STATSD_PORT,
+    TRACE_DIR,
+    PROFILE_TASK,
+    PROFILE_DIR
 )
 
 # --- Configuration ---
@@ -23,6 +52,19 @@ from dags import (
 PROJECT_ROOT_PATH = Path(__file__).parent.parent / "YFINANCE"
 
 # --- /Configuration ---
+
+
+def _task_log_dir(ti) -> str:
+    """Directory holding this task instance's log files under Airflow's default log layout."""
+    from airflow.configuration import conf
+
+    log_dir = Path(conf.get("logging", "base_log_folder")) / f"dag_id={ti.dag_id}" / f"run_id={ti.run_id}"
+    log_dir = log_dir / f"task_id={ti.task_id}"
+    if ti.map_index >= 0:
+        log_dir = log_dir / f"map_index={ti.map_index}"
+    return str(log_dir)
+
+
 @dag(
     dag_id="YFINANCE_DATA_LOAD",
     start_date=pendulum.datetime(2025, 4, 1, tz="UTC"),
@@ -59,6 +101,18 @@ def yahoo_finance_pipeline():
     """,
     )
 
+    @task
+    def shard_ticker_universe(tickers: list[str], num_shards: int) -> list[list[str]]:
+        """
+        Task to split the ticker universe into stable hash-based shards, one per mapped load task.
+        """
+        # Imported here so parsing the DAG doesn't load yfinance, pandas and the Snowflake connector
+        from src.yfinance_loader import shard_tickers
+
+        shards = shard_tickers(tickers, num_shards)
+        print(f"Split {len(tickers)} tickers into shards of sizes {[len(s) for s in shards]}")
+        return shards
+
     @task
     def extract_load_yahoo_finance(
         tickers: list[str],
@@ -66,40 +120,164 @@ def yahoo_finance_pipeline():
         db: str,
         schema: str,
         table: str,
-        logical_date,  # Airflow injects this!
+        logical_date_str: str,  # Rendered from {{ ds }}
+        ti=None,  # Airflow injects the task instance
     ):
         """
         Task to extract data for the previous day and load it into Snowflake.
         """
+        # Heavy dependencies are imported at run time only, keeping DAG parsing fast
+        from src.checkpoint import LoadCheckpoint
+        from src.fetch_cache import ParquetCacheFetcher, QuarantineFetcher
+        from src.log_config import queue_logging
+        from src.metrics import InMemoryMetrics, StatsdMetrics, set_metrics_backend
+        from src.profiling import profile_run
+        from src.rate_limit import AdaptiveRateLimiter, RateLimitedFetcher
+        from src.retry import CircuitBreaker, RetryingFetcher
+        from src.tracing import FileSpanExporter, Tracer, set_tracer
+        from src.yfinance_loader import (
+            FlushPolicy,
+            SnowflakeConnectionFactory,
+            YahooFinanceFetcher,
+            fetch_and_load_stock_data,
+            get_incremental_start_dates,
+            get_ticker_watermarks,
+        )
+
         # Calculate start and end dates for the previous day based on logical_date
         # logical_date is the *start* of the DAG run interval
-        end_date_str = logical_date
-        start_date = pendulum.from_format(logical_date, "YYYY-MM-DD", tz="UTC")
+        end_date_str = logical_date_str
+        start_date = pendulum.from_format(logical_date_str, "YYYY-MM-DD", tz="UTC")
         start_date = start_date.subtract(years=25)  # Use subtract for clarity
         start_date_str = start_date.to_date_string()
         print(
             f"Fetching data from {start_date_str} up to (but not including) {end_date_str}"
         )
 
-        fetch_and_load_stock_data(
-            tickers=tickers,
-            snowflake_conn_id=conn_id,
-            database=db,
-            schema=schema,
-            table_name=table,
-            start_date_str=start_date_str,
-            end_date_str=end_date_str,
+        # In incremental mode each ticker starts the day after its latest loaded DATE
+        start_dates = None
+        if INCREMENTAL_LOAD:
+            watermarks = get_ticker_watermarks(conn_id, db, schema, table)
+            start_dates = get_incremental_start_dates(tickers, watermarks, start_date_str)
+
+        rate_limiter = AdaptiveRateLimiter(
+            initial_rate=FETCH_RATE_LIMIT_INITIAL,
+            max_rate=FETCH_RATE_LIMIT_MAX,
+            initial_concurrency=FETCH_MAX_WORKERS,
+            max_concurrency=FETCH_MAX_WORKERS,
         )
+        fetcher_strategy = RetryingFetcher(
+            RateLimitedFetcher(
+                YahooFinanceFetcher(pool_size=FETCH_MAX_WORKERS, cache_dir=YFINANCE_CACHE_DIR),
+                rate_limiter,
+            ),
+            max_attempts=FETCH_MAX_ATTEMPTS,
+            base_delay=FETCH_RETRY_BASE_DELAY_SECONDS,
+            circuit_breaker=CircuitBreaker(error_rate_threshold=FETCH_CIRCUIT_BREAKER_ERROR_RATE),
+        )
+        if FETCH_CACHE_DIR:
+            fetcher_strategy = ParquetCacheFetcher(
+                fetcher_strategy,
+                cache_dir=FETCH_CACHE_DIR,
+                ttl_seconds=FETCH_CACHE_TTL_SECONDS,
+                max_bytes=FETCH_CACHE_MAX_BYTES,
+            )
+        quarantine = None
+        if TICKER_QUARANTINE_DIR:
+            # Shards are hash-stable, so each shard owns the quarantine file for its tickers
+            quarantine = QuarantineFetcher(
+                fetcher_strategy,
+                store_path=str(Path(TICKER_QUARANTINE_DIR) / f"shard_{ti.map_index}.json"),
+            )
+            fetcher_strategy = quarantine
+
+        metrics = None
+        if METRICS_BACKEND == "statsd":
+            metrics = StatsdMetrics(host=STATSD_HOST, port=STATSD_PORT)
+        elif METRICS_BACKEND == "memory":
+            metrics = InMemoryMetrics()
+        set_metrics_backend(metrics)
 
-    # Task to run the extraction and loading function
-    fetch_and_load_task = extract_load_yahoo_finance(
-        tickers=TICKER_SYMBOLS,
+        tracer = None
+        if TRACE_DIR:
+            tracer = Tracer(FileSpanExporter(
+                str(Path(TRACE_DIR) / logical_date_str / f"shard_{ti.map_index}.trace.json")
+            ))
+        set_tracer(tracer)
+
+        profiler = nullcontext()
+        if PROFILE_TASK:
+            profile_dir = _task_log_dir(ti)
+            if PROFILE_DIR:
+                profile_dir = str(Path(PROFILE_DIR) / logical_date_str / f"shard_{ti.map_index}")
+            profiler = profile_run(profile_dir, label=f"attempt={ti.try_number}.profile")
+
+        checkpoint = None
+        if LOAD_CHECKPOINT_DIR:
+            # A retry of this shard only processes tickers the failed try didn't commit
+            checkpoint = LoadCheckpoint(
+                store_path=str(Path(LOAD_CHECKPOINT_DIR) / logical_date_str / f"shard_{ti.map_index}.json"),
+                logical_date=logical_date_str,
+            )
+
+        # Loader logs go through a queue so fetch threads never block on log handlers
+        with queue_logging(log_file=LOADER_LOG_FILE):
+            try:
+                with profiler:
+                    fetch_and_load_stock_data(
+                        tickers=tickers,
+                        snowflake_conn_id=conn_id,
+                        database=db,
+                        schema=schema,
+                        table_name=table,
+                        start_date_str=start_date_str,
+                        end_date_str=end_date_str,
+                        fetcher_strategy=fetcher_strategy,
+                        max_workers=FETCH_MAX_WORKERS,
+                        start_dates=start_dates,
+                        date_windows=BACKFILL_DATE_WINDOWS,
+                        streaming=STREAMING_LOAD,
+                        flush_policy=FlushPolicy(
+                            max_rows=FLUSH_MAX_ROWS, max_bytes=FLUSH_MAX_BYTES, max_seconds=FLUSH_MAX_SECONDS
+                        ),
+                        load_mode=LOAD_MODE,
+                        arrow_native=ARROW_NATIVE_LOAD,
+                        checkpoint=checkpoint,
+                    )
+            except Exception:
+                if checkpoint is not None:
+                    checkpoint.save()
+                raise
+            else:
+                if checkpoint is not None:
+                    checkpoint.clear()
+            finally:
+                SnowflakeConnectionFactory.close_all()
+                print(f"Snowflake connections: {SnowflakeConnectionFactory.stats()}")
+                print(f"Rate limiter final state: {rate_limiter.stats()}")
+                if quarantine is not None:
+                    quarantine.save()
+                    quarantine.log_summary()
+                if isinstance(metrics, InMemoryMetrics):
+                    # Where the run's wall-clock went, largest total first
+                    for name, tags, count, total, longest in metrics.summary():
+                        print(f"{name} {tags}: {count} x, {total:.2f}s total, {longest:.2f}s max")
+                set_metrics_backend(None)
+                if tracer is not None:
+                    tracer.shutdown()
+                set_tracer(None)
+
+    # One mapped task instance per shard, each with its own retries
+    ticker_shards = shard_ticker_universe(tickers=TICKER_SYMBOLS, num_shards=TICKER_SHARDS)
+    if FETCH_POOL:
+        extract_load_yahoo_finance = extract_load_yahoo_finance.override(pool=FETCH_POOL)
+    fetch_and_load_task = extract_load_yahoo_finance.partial(
         conn_id=SF_CONN,
         db=SF_DB,
         schema=SF_SCHEMA,
         table=YFINANCE_TABLE,
-        logical_date="{{ ds }}",  # Pass logical_date using Airflow's macro
-    )
+        logical_date_str="{{ ds }}",  # Pass logical_date using Airflow's macro
+    ).expand(tickers=ticker_shards)
 
     start = EmptyOperator(task_id="start")
     end = EmptyOperator(task_id="end")
@@ -109,6 +287,7 @@ def yahoo_finance_pipeline():
         start
         >> ensure_schema_exist
         >> ensure_table_exist
+        >> ticker_shards
         >> fetch_and_load_task
         >> end
     )
@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+
+class LoadCheckpoint:
+    """
+    Persisted set of tickers whose data for one logical date is already committed to Snowflake,
+    or that had nothing to load. fetch_and_load_stock_data skips these tickers, so a task retry
+    only fetches and loads the remaining ones.
+
+    Tickers are marked only after the flush containing them has been written. Call save() when
+    a try fails so the next try can resume, and clear() once the load succeeds so a manual
+    re-run starts from scratch.
+    """
+
+    def __init__(self, store_path: str, logical_date: str):
+        self.store_path = Path(store_path)
+        self.logical_date = logical_date
+        self._lock = threading.Lock()
+        self._completed = set()
+        if self.store_path.exists():
+            with open(self.store_path) as f:
+                stored = json.load(f)
+            if stored.get("logical_date") == logical_date:
+                self._completed = set(stored["completed"])
+            else:
+                log.warning(
+                    f"Ignoring checkpoint {self.store_path} for logical date {stored.get('logical_date')}"
+                )
+
+    def completed(self):
+        with self._lock:
+            return set(self._completed)
+
+    def remaining(self, tickers):
+        """Returns tickers not yet completed, in their original order."""
+        completed = self.completed()
+        remaining = [ticker for ticker in tickers if ticker not in completed]
+        if len(remaining) < len(tickers):
+            log.info(
+                f"Resuming from checkpoint: skipping {len(tickers) - len(remaining)} tickers already "
+                f"loaded for {self.logical_date}, {len(remaining)} remaining"
+            )
+        return remaining
+
+    def mark_completed(self, tickers, persist=True):
+        with self._lock:
+            self._completed.update(tickers)
+        if persist:
+            self.save()
+
+    def save(self):
+        with self._lock:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.store_path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"logical_date": self.logical_date, "completed": sorted(self._completed)}, f)
+            os.replace(tmp_path, self.store_path)
+
+    def clear(self):
+        with self._lock:
+            self._completed.clear()
+            self.store_path.unlink(missing_ok=True)
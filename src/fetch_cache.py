@@ -0,0 +1,330 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+from src.rate_limit import is_throttling_error
+from src.yfinance_loader import DataFetcherStrategy, FetchAbortedError, in_window_fetch
+
+log = logging.getLogger(__name__)
+
+
+class ParquetCacheFetcher(DataFetcherStrategy):
+    """
+    Decorator around any DataFetcherStrategy that keeps each ticker's history as a local Parquet
+    file named after the ticker and the date range it covers.
+
+    A request is served from an unexpired entry for the same ticker that starts on or before the
+    requested start date. If that entry ends before the requested end date, only the missing tail
+    is fetched from the wrapped strategy and merged into the entry. Batches keep the wrapped
+    strategy's batch_size: misses, and tails that start on the same date, are fetched together
+    with one fetch_batch call. Entries expire ttl_seconds
+    after their oldest rows were fetched, and least-recently-used files are evicted once the
+    cache directory grows past max_bytes. Lookups only list the requested ticker's files, and
+    the directory size is tracked as a running total (scanned once at start), so the full
+    directory is only scanned when an eviction is due.
+    """
+
+    def __init__(
+        self,
+        fetcher_strategy: DataFetcherStrategy,
+        cache_dir: str,
+        ttl_seconds: float = 12 * 60 * 60,
+        max_bytes: int = 2 * 1024 ** 3,
+    ):
+        self.fetcher_strategy = fetcher_strategy
+        self.batch_size = fetcher_strategy.batch_size
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._stat_entries())
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return self.fetch_batch([ticker_symbol], start_date_str, end_date_str)[ticker_symbol]
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        results = {}
+        partial_hits = {}
+        # Misses are fetched from start_date_str, partial hits from their entry's end date
+        to_fetch = {}
+        for ticker_symbol in ticker_symbols:
+            entry = self._find_entry(ticker_symbol, start_date_str)
+            if entry is None:
+                to_fetch.setdefault(start_date_str, []).append(ticker_symbol)
+                continue
+
+            path, entry_start, entry_end = entry
+            cached = pd.read_parquet(path)
+            self._touch(path)
+            if entry_end < end_date_str:
+                log.info(f"Cache hit for {ticker_symbol} up to {entry_end}; fetching tail to {end_date_str}")
+                partial_hits[ticker_symbol] = (path, entry_start, cached)
+                to_fetch.setdefault(entry_end, []).append(ticker_symbol)
+            else:
+                log.info(f"Cache hit for {ticker_symbol} from {start_date_str} to {end_date_str}")
+                hist = _slice_dates(cached, start_date_str, end_date_str)
+                results[ticker_symbol] = None if hist.empty else hist
+
+        for fetch_start, group in to_fetch.items():
+            fetched = self._fetch_group(group, fetch_start, end_date_str)
+            for ticker_symbol in group:
+                hist = fetched.get(ticker_symbol)
+                if ticker_symbol not in partial_hits:
+                    if hist is not None and not hist.empty:
+                        self._store(ticker_symbol, start_date_str, end_date_str, hist)
+                    results[ticker_symbol] = hist
+                    continue
+
+                path, entry_start, cached = partial_hits[ticker_symbol]
+                if hist is not None and not hist.empty:
+                    cached = pd.concat([cached, hist])
+                    cached = cached[~cached.index.duplicated(keep="last")].sort_index()
+                self._store(ticker_symbol, entry_start, end_date_str, cached, replaces=path)
+                hist = _slice_dates(cached, start_date_str, end_date_str)
+                results[ticker_symbol] = None if hist.empty else hist
+        return results
+
+    def _fetch_group(self, ticker_symbols, start_date_str, end_date_str):
+        if len(ticker_symbols) == 1:
+            return {
+                ticker_symbols[0]: self.fetcher_strategy.fetch_data(ticker_symbols[0], start_date_str, end_date_str)
+            }
+        return self.fetcher_strategy.fetch_batch(ticker_symbols, start_date_str, end_date_str)
+
+    def _entries(self, ticker_symbol=None):
+        pattern = "*.parquet"
+        if ticker_symbol is not None:
+            pattern = f"{glob.escape(_safe_name(ticker_symbol))}__*.parquet"
+        for path in self.cache_dir.glob(pattern):
+            try:
+                ticker, entry_start, entry_end = path.stem.rsplit("__", 2)
+            except ValueError:
+                continue
+            if ticker_symbol is None or ticker == _safe_name(ticker_symbol):
+                yield path, entry_start, entry_end
+
+    def _stat_entries(self):
+        for path, _, _ in self._entries():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_atime, stat.st_size, path
+
+    def _find_entry(self, ticker_symbol, start_date_str):
+        now_ts = time.time()
+        best = None
+        for path, entry_start, entry_end in self._entries(ticker_symbol):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now_ts - stat.st_mtime > self.ttl_seconds:
+                log.info(f"Cache entry {path.name} expired; removing")
+                self._remove(path, stat.st_size)
+                continue
+            if entry_start <= start_date_str < entry_end and (best is None or entry_end > best[2]):
+                best = (path, entry_start, entry_end)
+        return best
+
+    def _remove(self, path, size):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._total_bytes -= size
+
+    def _store(self, ticker_symbol, start_date_str, end_date_str, hist, replaces=None):
+        path = self.cache_dir / f"{_safe_name(ticker_symbol)}__{start_date_str}__{end_date_str}.parquet"
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        hist.to_parquet(tmp_path)
+        added = tmp_path.stat().st_size
+        with self._lock:
+            created = None
+            if replaces is not None and replaces.exists():
+                # Keep the original fetch time so the TTL still covers the oldest cached rows
+                created = replaces.stat().st_mtime
+                if replaces != path:
+                    added -= replaces.stat().st_size
+                    replaces.unlink(missing_ok=True)
+            if path.exists():
+                added -= path.stat().st_size
+            os.replace(tmp_path, path)
+            if created is not None:
+                os.utime(path, (time.time(), created))
+            self._total_bytes += added
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _touch(self, path):
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        # Rescanning also corrects the running total for files changed by other processes
+        files = sorted(self._stat_entries(), key=lambda f: f[0])
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            log.info(f"Evicting least recently used cache entry {path.name}")
+            path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+
+class QuarantineFetcher(DataFetcherStrategy):
+    """
+    Decorator that keeps a persisted negative cache of tickers that returned no data or raised.
+    A quarantined ticker is skipped (treated as returning no data) until its cool-down expires;
+    the cool-down starts at base_cooldown_seconds and doubles with every consecutive failed
+    re-check, up to max_cooldown_seconds. Any successful fetch releases the ticker.
+
+    Throttling errors and run aborts are not held against the ticker, and neither are empty
+    results for ranges shorter than min_empty_range_days (an incremental fetch over a weekend or
+    holiday is legitimately empty). Date-window fetches are judged once per ticker on the
+    stitched result via record_ticker_result, so an empty window from before a ticker listed
+    doesn't quarantine it. Batches keep the wrapped strategy's batch_size: quarantined tickers
+    are dropped from a batch and the rest are fetched with one fetch_batch call. Call save() at
+    the end of a run to persist the store and log_summary() to report the requests it saved.
+    """
+
+    def __init__(
+        self,
+        fetcher_strategy: DataFetcherStrategy,
+        store_path: str,
+        base_cooldown_seconds: float = 24 * 60 * 60,
+        max_cooldown_seconds: float = 30 * 24 * 60 * 60,
+        min_empty_range_days: int = 7,
+    ):
+        self.fetcher_strategy = fetcher_strategy
+        self.batch_size = fetcher_strategy.batch_size
+        self.store_path = Path(store_path)
+        self.min_empty_range_days = min_empty_range_days
+        self.base_cooldown_seconds = base_cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self.requests_saved = 0
+        self.newly_quarantined = 0
+        self.released = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.store_path.exists():
+            with open(self.store_path) as f:
+                self._entries = json.load(f)
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return self.fetch_batch([ticker_symbol], start_date_str, end_date_str)[ticker_symbol]
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        results = {}
+        to_fetch = []
+        now = time.time()
+        with self._lock:
+            for ticker_symbol in ticker_symbols:
+                entry = self._entries.get(ticker_symbol)
+                if entry is not None and now < entry["next_check"]:
+                    self.requests_saved += 1
+                    log.debug(f"Skipping quarantined ticker {ticker_symbol} ({entry['reason']})")
+                    results[ticker_symbol] = None
+                else:
+                    to_fetch.append(ticker_symbol)
+        if not to_fetch:
+            return results
+
+        try:
+            fetched = self._fetch_group(to_fetch, start_date_str, end_date_str)
+        except Exception as e:
+            if not in_window_fetch():
+                for ticker_symbol in to_fetch:
+                    self._judge(ticker_symbol, start_date_str, end_date_str, None, e)
+            raise
+        for ticker_symbol in to_fetch:
+            hist = fetched.get(ticker_symbol)
+            if not in_window_fetch():
+                self._judge(ticker_symbol, start_date_str, end_date_str, hist)
+            results[ticker_symbol] = hist
+        return results
+
+    def _fetch_group(self, ticker_symbols, start_date_str, end_date_str):
+        if len(ticker_symbols) == 1:
+            return {
+                ticker_symbols[0]: self.fetcher_strategy.fetch_data(ticker_symbols[0], start_date_str, end_date_str)
+            }
+        return self.fetcher_strategy.fetch_batch(ticker_symbols, start_date_str, end_date_str)
+
+    def record_ticker_result(self, ticker_symbol, start_date_str, end_date_str, hist, error=None):
+        with self._lock:
+            entry = self._entries.get(ticker_symbol)
+            skipped = entry is not None and time.time() < entry["next_check"]
+        # A ticker whose windows were all skipped wasn't re-checked, so its cool-down stands
+        if not skipped:
+            self._judge(ticker_symbol, start_date_str, end_date_str, hist, error)
+        super().record_ticker_result(ticker_symbol, start_date_str, end_date_str, hist, error)
+
+    def _judge(self, ticker_symbol, start_date_str, end_date_str, hist, error=None):
+        if error is not None:
+            if not isinstance(error, FetchAbortedError) and not is_throttling_error(error):
+                self._quarantine(ticker_symbol, f"error: {error}")
+        elif hist is None or hist.empty:
+            range_days = (date.fromisoformat(end_date_str) - date.fromisoformat(start_date_str)).days
+            if range_days >= self.min_empty_range_days:
+                self._quarantine(ticker_symbol, "empty")
+        else:
+            with self._lock:
+                if self._entries.pop(ticker_symbol, None) is not None:
+                    self.released += 1
+
+    def _quarantine(self, ticker_symbol, reason):
+        with self._lock:
+            entry = self._entries.get(ticker_symbol)
+            failures = 1 if entry is None else entry["failures"] + 1
+            if entry is None:
+                self.newly_quarantined += 1
+            cooldown = min(self.max_cooldown_seconds, self.base_cooldown_seconds * 2 ** (failures - 1))
+            self._entries[ticker_symbol] = {
+                "failures": failures,
+                "next_check": time.time() + cooldown,
+                "reason": reason,
+            }
+
+    def quarantined_tickers(self):
+        with self._lock:
+            return sorted(self._entries)
+
+    def save(self):
+        with self._lock:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.store_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.store_path)
+
+    def log_summary(self):
+        with self._lock:
+            log.info(
+                f"Quarantine saved {self.requests_saved} requests this run; "
+                f"{self.newly_quarantined} newly quarantined, {self.released} released, "
+                f"{len(self._entries)} tickers quarantined in total"
+            )
+
+
+def _safe_name(ticker_symbol):
+    return ticker_symbol.replace(os.sep, "_")
+
+
+def _slice_dates(hist, start_date_str, end_date_str):
+    index = hist.index
+    start = pd.Timestamp(start_date_str, tz=getattr(index, "tz", None))
+    end = pd.Timestamp(end_date_str, tz=getattr(index, "tz", None))
+    return hist[(index >= start) & (index < end)]
@@ -0,0 +1,46 @@
+import logging
+import queue
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(threadName)s - %(message)s"
+
+
+@contextmanager
+def queue_logging(log_file: str = None, level: int = logging.INFO, logger_name: str = "src"):
+    """
+    Opt-in non-blocking logging for the loader modules. While active, records from logger_name
+    (and its children, e.g. src.yfinance_loader) are put on an in-memory queue by a QueueHandler,
+    and a QueueListener thread hands them to the real handlers, so fetch worker threads never
+    wait on a handler lock or on file I/O.
+
+    The listener writes to the handlers the root logger has when the block starts (such as the
+    Airflow task log) plus, if log_file is given, a FileHandler for that file. The logger's
+    previous handlers, level and propagation are restored on exit, after the queue is drained.
+    """
+    logger = logging.getLogger(logger_name)
+    handlers = list(logging.getLogger().handlers)
+    file_handler = None
+    if log_file:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(file_handler)
+    if not handlers:
+        handlers.append(logging.lastResort)
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    saved_handlers, saved_level, saved_propagate = logger.handlers[:], logger.level, logger.propagate
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+    listener.start()
+    try:
+        yield listener
+    finally:
+        listener.stop()
+        logger.handlers = saved_handlers
+        logger.setLevel(saved_level)
+        logger.propagate = saved_propagate
+        if file_handler is not None:
+            file_handler.close()
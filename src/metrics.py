@@ -0,0 +1,151 @@
+import logging
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+
+class MetricsBackend(ABC):
+    """
+    Receives timings, counters and value distributions from the loader. Implementations must be
+    thread-safe, since fetch worker threads and the streaming sink emit concurrently. Tags are a
+    small dict of low-cardinality labels (never tickers).
+    """
+
+    # Lets callers skip computing values (e.g. deep frame sizes) nobody will receive
+    enabled = True
+
+    @abstractmethod
+    def timing(self, name: str, seconds: float, tags: dict | None = None):
+        pass
+
+    @abstractmethod
+    def increment(self, name: str, value: int = 1, tags: dict | None = None):
+        pass
+
+    @abstractmethod
+    def histogram(self, name: str, value: float, tags: dict | None = None):
+        pass
+
+    @contextmanager
+    def timer(self, name: str, tags: dict | None = None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timing(name, time.perf_counter() - started, tags)
+
+
+class NoOpMetrics(MetricsBackend):
+    """Default backend; discards everything."""
+
+    enabled = False
+
+    def timing(self, name, seconds, tags=None):
+        pass
+
+    def increment(self, name, value=1, tags=None):
+        pass
+
+    def histogram(self, name, value, tags=None):
+        pass
+
+
+class InMemoryMetrics(MetricsBackend):
+    """Keeps every emitted value in memory, keyed by (name, sorted tags). Meant for tests and local runs."""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.counters = defaultdict(int)
+        self.histograms = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, tags):
+        return name, tuple(sorted((tags or {}).items()))
+
+    def timing(self, name, seconds, tags=None):
+        with self._lock:
+            self.timings[self._key(name, tags)].append(seconds)
+
+    def increment(self, name, value=1, tags=None):
+        with self._lock:
+            self.counters[self._key(name, tags)] += value
+
+    def histogram(self, name, value, tags=None):
+        with self._lock:
+            self.histograms[self._key(name, tags)].append(value)
+
+    def timing_values(self, name, **tags):
+        """All timings for name whose tags include the given ones."""
+        return self._matching(self.timings, name, tags, [])
+
+    def histogram_values(self, name, **tags):
+        return self._matching(self.histograms, name, tags, [])
+
+    def counter(self, name, **tags):
+        return self._matching(self.counters, name, tags, 0)
+
+    def _matching(self, store, name, tags, empty):
+        with self._lock:
+            result = empty
+            for (metric_name, metric_tags), values in store.items():
+                if metric_name == name and set(tags.items()) <= set(metric_tags):
+                    result = result + values
+            return result
+
+    def summary(self):
+        """Per-timing count, total and max seconds, sorted by total time spent."""
+        with self._lock:
+            rows = [
+                (name, dict(tags), len(values), sum(values), max(values))
+                for (name, tags), values in self.timings.items()
+            ]
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+class StatsdMetrics(MetricsBackend):
+    """
+    Sends metrics over UDP in the StatsD line protocol, with DogStatsD-style tags. Sends are
+    fire-and-forget; errors are logged at debug level and never interrupt a load.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 8125, prefix: str = "yfinance"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, name, value, metric_type, tags):
+        line = f"{self.prefix}.{name}:{value}|{metric_type}"
+        if tags:
+            line += "|#" + ",".join(f"{k}:{v}" for k, v in sorted(tags.items()))
+        try:
+            self._socket.sendto(line.encode(), self.address)
+        except OSError as e:
+            log.debug(f"Dropping metric {name}: {e}")
+
+    def timing(self, name, seconds, tags=None):
+        self._send(name, round(seconds * 1000, 3), "ms", tags)
+
+    def increment(self, name, value=1, tags=None):
+        self._send(name, value, "c", tags)
+
+    def histogram(self, name, value, tags=None):
+        self._send(name, value, "h", tags)
+
+
+_backend = NoOpMetrics()
+
+
+def get_metrics() -> MetricsBackend:
+    return _backend
+
+
+def set_metrics_backend(backend: MetricsBackend | None):
+    """Installs the process-wide metrics backend; None restores the no-op default."""
+    global _backend
+    _backend = backend or NoOpMetrics()
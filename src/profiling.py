@@ -0,0 +1,176 @@
+import argparse
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+# Allocations made by the profilers themselves or while importing modules are not the loader's
+_ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+@contextmanager
+def profile_run(output_dir: str, label: str = "fetch_and_load", top_n: int = 30, traceback_frames: int = 10):
+    """
+    Profiles the enclosed block with cProfile and tracemalloc and writes, on exit:
+
+    - <label>.prof: raw cProfile stats, for snakeviz or pstats
+    - <label>.pstats.txt: the top_n functions by cumulative and by own time
+    - <label>.alloc.txt: peak traced memory and the top_n allocation sites still held at the
+      end of the block, by line and with tracebacks for the largest ones
+
+    Threads started inside the block (fetch workers, the streaming sink) are profiled as well
+    and merged into the same stats. Yields a dict that maps "profile", "stats" and "allocations"
+    to the written paths once the block has exited. Files are written even if the block raises,
+    since a failing or out-of-memory run is usually the one worth looking at.
+    """
+    output_dir = Path(output_dir)
+    outputs = {}
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(traceback_frames)
+    tracemalloc.reset_peak()
+
+    profiler = cProfile.Profile()
+    thread_profilers = []
+    if sys.version_info < (3, 12):
+        # Before 3.12 a profiler only sees the thread that enabled it
+        def enable_in_thread(*args):
+            thread_profiler = cProfile.Profile()
+            thread_profilers.append(thread_profiler)
+            thread_profiler.enable()
+
+        threading.setprofile(enable_in_thread)
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield outputs
+    finally:
+        profiler.disable()
+        threading.setprofile(None)
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot().filter_traces(_ALLOCATION_FILTERS)
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stats = pstats.Stats(profiler)
+        for thread_profiler in thread_profilers:
+            stats.add(thread_profiler)
+        outputs["profile"] = output_dir / f"{label}.prof"
+        stats.dump_stats(outputs["profile"])
+        outputs["stats"] = output_dir / f"{label}.pstats.txt"
+        outputs["stats"].write_text(_format_stats(stats, top_n, elapsed))
+        outputs["allocations"] = output_dir / f"{label}.alloc.txt"
+        outputs["allocations"].write_text(_format_allocations(snapshot, top_n, current_bytes, peak_bytes))
+        log.info(
+            f"Profiled {label} in {elapsed:.1f}s (peak traced memory {peak_bytes / 1024 ** 2:.1f} MB); "
+            f"wrote {', '.join(str(path) for path in outputs.values())}"
+        )
+
+
+def _format_stats(stats, top_n, elapsed):
+    stream = io.StringIO()
+    stream.write(f"Wall-clock time: {elapsed:.2f}s\n")
+    stats.stream = stream
+    for sort_key in ("cumulative", "tottime"):
+        stream.write(f"\n=== Top {top_n} functions by {sort_key} time ===\n")
+        stats.sort_stats(sort_key).print_stats(top_n)
+    return stream.getvalue()
+
+
+def _format_allocations(snapshot, top_n, current_bytes, peak_bytes):
+    lines = [
+        f"Peak traced memory: {peak_bytes / 1024 ** 2:.1f} MB",
+        f"Traced memory at exit: {current_bytes / 1024 ** 2:.1f} MB",
+        "",
+        f"=== Top {top_n} allocation sites by line ===",
+    ]
+    for stat in snapshot.statistics("lineno")[:top_n]:
+        lines.append(str(stat))
+    lines += ["", "=== Largest allocation tracebacks ==="]
+    for stat in snapshot.statistics("traceback")[:min(top_n, 5)]:
+        lines.append(f"{stat.count} blocks, {stat.size / 1024:.1f} KiB")
+        lines.extend(f"    {line}" for line in stat.traceback.format())
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    """Runs one profiled load (or fetch only) outside Airflow, e.g. against a local connection."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.profiling", description="Profile fetch_and_load_stock_data for a set of tickers."
+    )
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD), exclusive")
+    parser.add_argument("--output-dir", default="profiles")
+    parser.add_argument("--label", default="fetch_and_load")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--max-workers", type=int, default=1)
+    parser.add_argument(
+        "--fetch-only", action="store_true", help="Fetch and normalize the frames but skip Snowflake"
+    )
+    parser.add_argument("--conn-id", default="snowflake_default")
+    parser.add_argument("--database")
+    parser.add_argument("--schema")
+    parser.add_argument("--table")
+    parser.add_argument("--load-mode", default="write_pandas")
+    parser.add_argument("--arrow-native", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.fetch_only and not (args.database and args.schema and args.table):
+        parser.error("--database, --schema and --table are required unless --fetch-only is given")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    from src.yfinance_loader import (
+        YahooFinanceFetcher,
+        _iter_fetch_results,
+        fetch_and_load_stock_data,
+        normalize_frames,
+    )
+
+    fetcher_strategy = YahooFinanceFetcher(pool_size=args.max_workers)
+    with profile_run(args.output_dir, label=args.label, top_n=args.top) as outputs:
+        if args.fetch_only:
+            start_dates = {ticker_symbol: args.start for ticker_symbol in args.tickers}
+            frames = [
+                hist
+                for _, hist, _ in _iter_fetch_results(
+                    args.tickers, fetcher_strategy, start_dates, args.end, args.max_workers
+                )
+                if hist is not None
+            ]
+            if frames:
+                normalize_frames(frames)
+        else:
+            fetch_and_load_stock_data(
+                tickers=args.tickers,
+                snowflake_conn_id=args.conn_id,
+                table_name=args.table,
+                schema=args.schema,
+                database=args.database,
+                start_date_str=args.start,
+                end_date_str=args.end,
+                fetcher_strategy=fetcher_strategy,
+                max_workers=args.max_workers,
+                load_mode=args.load_mode,
+                arrow_native=args.arrow_native,
+            )
+    for path in outputs.values():
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import threading
+import time
+
+from src.yfinance_loader import AsyncDataFetcherStrategy, DataFetcherStrategy, in_window_fetch
+
+log = logging.getLogger(__name__)
+
+
+def is_throttling_error(error):
+    """
+    Returns True for errors that indicate Yahoo is rate limiting us. Matched by name and message
+    so it works across yfinance versions that do and don't define YFRateLimitError.
+    """
+    message = str(error)
+    return (
+        type(error).__name__ == "YFRateLimitError"
+        or "Too Many Requests" in message
+        or "429" in message
+    )
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe token bucket with an AIMD-controlled rate and concurrency limit, meant to be
+    shared by every fetcher strategy in a run.
+
+    Every window_size completed requests the share of throttled or empty responses is compared
+    with error_threshold. Above it, rate and concurrency are multiplied by decrease_factor; at
+    or below it, the rate grows by increase_step requests/second and concurrency by one, up to
+    max_rate and max_concurrency. Each adjustment is logged with the new limits.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 5.0,
+        min_rate: float = 0.5,
+        max_rate: float = 50.0,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        burst: float = None,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        error_threshold: float = 0.2,
+        window_size: int = 50,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.burst = burst
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.error_threshold = error_threshold
+        self.window_size = window_size
+
+        self.current_rate = initial_rate
+        self.concurrency_limit = initial_concurrency
+        self.in_flight = 0
+        self.total_requests = 0
+        self.total_throttled = 0
+        self.total_empty = 0
+
+        self._tokens = self._capacity()
+        self._last_refill = time.monotonic()
+        self._window_requests = 0
+        self._window_bad = 0
+        self._cond = threading.Condition()
+
+    def _capacity(self):
+        return max(1.0, self.burst if self.burst is not None else self.current_rate)
+
+    def _refill(self):
+        now_ts = time.monotonic()
+        self._tokens = min(self._capacity(), self._tokens + (now_ts - self._last_refill) * self.current_rate)
+        self._last_refill = now_ts
+
+    def _try_acquire(self, tokens):
+        """
+        Takes a slot and tokens if available; otherwise returns the seconds to wait. A cost above
+        the bucket's capacity is taken once the bucket is full and leaves it in debt, so later
+        requests wait until the whole cost has been paid back at the current rate.
+        """
+        self._refill()
+        if self.in_flight >= self.concurrency_limit:
+            return None
+        needed = min(tokens, self._capacity())
+        if self._tokens >= needed:
+            self._tokens -= tokens
+            self.in_flight += 1
+            return 0.0
+        return (needed - self._tokens) / self.current_rate
+
+    def acquire(self, tokens: float = 1):
+        with self._cond:
+            while True:
+                wait = self._try_acquire(tokens)
+                if wait == 0.0:
+                    return
+                self._cond.wait(timeout=wait)
+
+    async def acquire_async(self, tokens: float = 1, poll_interval: float = 0.05):
+        while True:
+            with self._cond:
+                wait = self._try_acquire(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(poll_interval if wait is None else wait)
+
+    def release(self, requests: int = 1, throttled: int = 0, empty: int = 0):
+        """Returns the concurrency slot and records the outcome of the requests it covered."""
+        with self._cond:
+            self.in_flight -= 1
+            self.total_requests += requests
+            self.total_throttled += throttled
+            self.total_empty += empty
+            self._window_requests += requests
+            self._window_bad += throttled + empty
+            if self._window_requests >= self.window_size:
+                self._adjust()
+            self._cond.notify_all()
+
+    def _adjust(self):
+        bad_ratio = self._window_bad / self._window_requests
+        if bad_ratio > self.error_threshold:
+            self.current_rate = max(self.min_rate, self.current_rate * self.decrease_factor)
+            self.concurrency_limit = max(1, int(self.concurrency_limit * self.decrease_factor))
+            action = "Backing off"
+        else:
+            self.current_rate = min(self.max_rate, self.current_rate + self.increase_step)
+            self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1)
+            action = "Ramping up"
+        self._tokens = min(self._tokens, self._capacity())
+        log.info(
+            f"{action}: rate={self.current_rate:.2f} req/s, concurrency={self.concurrency_limit} "
+            f"(throttled/empty {bad_ratio:.0%} of last {self._window_requests} requests)"
+        )
+        self._window_requests = 0
+        self._window_bad = 0
+
+    def stats(self):
+        with self._cond:
+            return {
+                "current_rate": self.current_rate,
+                "concurrency_limit": self.concurrency_limit,
+                "in_flight": self.in_flight,
+                "total_requests": self.total_requests,
+                "total_throttled": self.total_throttled,
+                "total_empty": self.total_empty,
+            }
+
+
+class RateLimitedFetcher(DataFetcherStrategy):
+    """
+    Decorator that routes every request of the wrapped strategy through a shared
+    AdaptiveRateLimiter. Batches take one token per ticker. Empty results of date-window
+    fetches are not reported as bad responses, since leading windows of a backfill are
+    empty for every ticker listed after the range starts.
+    """
+
+    def __init__(self, fetcher_strategy: DataFetcherStrategy, rate_limiter: AdaptiveRateLimiter):
+        self.fetcher_strategy = fetcher_strategy
+        self.rate_limiter = rate_limiter
+        self.batch_size = fetcher_strategy.batch_size
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return self.fetch_batch([ticker_symbol], start_date_str, end_date_str)[ticker_symbol]
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        self.rate_limiter.acquire(len(ticker_symbols))
+        results = {}
+        error = None
+        try:
+            if len(ticker_symbols) == 1:
+                results = {
+                    ticker_symbols[0]: self.fetcher_strategy.fetch_data(
+                        ticker_symbols[0], start_date_str, end_date_str
+                    )
+                }
+            else:
+                results = self.fetcher_strategy.fetch_batch(ticker_symbols, start_date_str, end_date_str)
+            return results
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            throttled = empty = 0
+            if error is not None:
+                throttled = len(ticker_symbols) if is_throttling_error(error) else 0
+            elif not in_window_fetch():
+                empty = sum(1 for ticker_symbol in ticker_symbols if results.get(ticker_symbol) is None)
+            self.rate_limiter.release(requests=len(ticker_symbols), throttled=throttled, empty=empty)
+
+
+class AsyncRateLimitedFetcher(AsyncDataFetcherStrategy):
+    """Async counterpart of RateLimitedFetcher sharing the same AdaptiveRateLimiter."""
+
+    def __init__(self, fetcher_strategy: AsyncDataFetcherStrategy, rate_limiter: AdaptiveRateLimiter):
+        self.fetcher_strategy = fetcher_strategy
+        self.rate_limiter = rate_limiter
+
+    async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        await self.rate_limiter.acquire_async()
+        hist = None
+        error = None
+        try:
+            hist = await self.fetcher_strategy.fetch_data(ticker_symbol, start_date_str, end_date_str)
+            return hist
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if error is not None:
+                self.rate_limiter.release(throttled=int(is_throttling_error(error)))
+            else:
+                self.rate_limiter.release(empty=int(hist is None))
@@ -0,0 +1,119 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+from src.yfinance_loader import DataFetcherStrategy, FetchAbortedError, in_window_fetch
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(FetchAbortedError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcome of the last window_size upstream attempts across all threads. Once at
+    least min_requests have been recorded and the failure ratio reaches error_rate_threshold, the
+    breaker opens and stays open for the rest of the run.
+    """
+
+    def __init__(self, error_rate_threshold: float = 0.5, min_requests: int = 20, window_size: int = 100):
+        self.error_rate_threshold = error_rate_threshold
+        self.min_requests = min_requests
+        self.is_open = False
+        self._outcomes = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+
+    def check(self):
+        if self.is_open:
+            raise CircuitOpenError("Circuit breaker is open: upstream error rate exceeded threshold")
+
+    def record(self, success: bool):
+        with self._lock:
+            self._outcomes.append(success)
+            if self.is_open or len(self._outcomes) < self.min_requests:
+                return
+            error_rate = self._outcomes.count(False) / len(self._outcomes)
+            if error_rate >= self.error_rate_threshold:
+                self.is_open = True
+                log.error(
+                    f"Opening circuit breaker: {error_rate:.0%} of the last {len(self._outcomes)} "
+                    f"upstream attempts failed"
+                )
+
+
+class RetryingFetcher(DataFetcherStrategy):
+    """
+    Decorator that retries failed fetches of the wrapped strategy with exponential backoff and
+    jitter, and reports every attempt to an optional shared CircuitBreaker.
+
+    The delay before retry n is min(max_delay, base_delay * 2 ** (n - 1)), reduced by a random
+    fraction of up to jitter. Empty results are not retried; they only count as breaker failures
+    when empty_is_failure is set, since yfinance reports some upstream errors as empty frames,
+    and never for date-window fetches, whose leading windows are legitimately empty.
+    """
+
+    def __init__(
+        self,
+        fetcher_strategy: DataFetcherStrategy,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        jitter: float = 0.5,
+        circuit_breaker: CircuitBreaker = None,
+        empty_is_failure: bool = False,
+    ):
+        self.fetcher_strategy = fetcher_strategy
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.circuit_breaker = circuit_breaker
+        self.empty_is_failure = empty_is_failure
+        self.batch_size = fetcher_strategy.batch_size
+
+    def backoff_delay(self, attempt):
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return self.fetch_batch([ticker_symbol], start_date_str, end_date_str)[ticker_symbol]
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        for attempt in range(1, self.max_attempts + 1):
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.check()
+            try:
+                if len(ticker_symbols) == 1:
+                    results = {
+                        ticker_symbols[0]: self.fetcher_strategy.fetch_data(
+                            ticker_symbols[0], start_date_str, end_date_str
+                        )
+                    }
+                else:
+                    results = self.fetcher_strategy.fetch_batch(ticker_symbols, start_date_str, end_date_str)
+            except FetchAbortedError:
+                raise
+            except Exception as e:
+                self._record(False)
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.backoff_delay(attempt)
+                log.warning(
+                    f"Attempt {attempt}/{self.max_attempts} for {', '.join(ticker_symbols)} failed: {e}; "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+
+            empty_is_failure = self.empty_is_failure and not in_window_fetch()
+            for ticker_symbol in ticker_symbols:
+                self._record(not (empty_is_failure and results.get(ticker_symbol) is None))
+            return results
+
+    def _record(self, success):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(success)
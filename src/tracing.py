@@ -0,0 +1,177 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+_current_span = contextvars.ContextVar("yfinance_current_span", default=None)
+
+
+class Span:
+    """One timed operation. Attributes can be added while the span is open via set()."""
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.thread_name = threading.current_thread().name
+        self.thread_id = threading.get_ident()
+        self.start_time = time.time()
+        self.end_time = None
+        self.error = None
+
+    @property
+    def duration(self):
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "thread": self.thread_name,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NullSpan:
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list. Meant for tests and interactive runs."""
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+class FileSpanExporter:
+    """
+    Collects finished spans and writes them on shutdown() as a Chrome trace event file, which
+    chrome://tracing and Perfetto render as a per-thread timeline.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._events = []
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "ts": round(span.start_time * 1e6),
+            "dur": round(span.duration * 1e6),
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": {**span.attributes, "span_id": span.span_id, "parent_id": span.parent_id},
+        }
+        if span.error is not None:
+            event["args"]["error"] = span.error
+        with self._lock:
+            self._events.append(event)
+
+    def shutdown(self):
+        with self._lock:
+            events = list(self._events)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        log.info(f"Wrote {len(events)} trace spans to {self.path}")
+
+
+class Tracer:
+    """
+    Records nested spans and hands each finished span to the exporter. The current span is
+    tracked in a context variable, so spans opened on worker threads nest under the span that
+    was current when the work was submitted (see propagate()).
+    """
+
+    enabled = True
+
+    def __init__(self, exporter):
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        parent = _current_span.get()
+        trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        span = Span(name, trace_id, parent.span_id if parent is not None else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_time = time.time()
+            _current_span.reset(token)
+            self.exporter.export(span)
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+
+class NoOpTracer:
+    """Default tracer; spans cost one context manager and are discarded."""
+
+    enabled = False
+
+    @contextmanager
+    def span(self, name, **attributes):
+        yield _NULL_SPAN
+
+    def shutdown(self):
+        pass
+
+
+_tracer = NoOpTracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer(tracer):
+    """Installs the process-wide tracer; None restores the no-op default."""
+    global _tracer
+    _tracer = tracer or NoOpTracer()
+
+
+def propagate(fn):
+    """
+    Wraps fn to run in a copy of the caller's context, so work handed to another thread keeps
+    its parent span. Wrap once per submitted call; a context can't be entered twice at once.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return run
@@ -1,65 +1,754 @@
 import yfinance as yf
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.api.types import union_categoricals
 from airflow.providers.snowflake.hooks.snowflake import SnowflakeHook
 from airflow.exceptions import AirflowException
 from snowflake.connector.pandas_tools import write_pandas
 from pendulum import now
+import asyncio
+import contextvars
 import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import zlib
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import partial, wraps
+from datetime import date, timedelta
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+from src.checkpoint import LoadCheckpoint
+from src.metrics import get_metrics
+from src.tracing import get_tracer, propagate
+
+# Shortest range worth splitting into its own date window
+MIN_DATE_WINDOW_DAYS = 365
+
+# Handlers are left to the caller, e.g. src.log_config.queue_logging
 log = logging.getLogger(__name__)
 
-# Add a file handler to log to a file
-file_handler = logging.FileHandler("yfinance_loader.log")
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-log.addHandler(file_handler)
+class FetchAbortedError(Exception):
+    """Raised by a fetcher strategy to stop the whole run rather than just skip one ticker."""
+
+_window_fetch = contextvars.ContextVar("yfinance_window_fetch", default=False)
+
+def in_window_fetch():
+    """
+    True while a strategy is asked for one date window of a ticker's range (see date_windows in
+    fetch_and_load_stock_data). A window before the ticker listed is legitimately empty, so
+    decorators should not treat an empty result as a bad response while this is set.
+    """
+    return _window_fetch.get()
 
 class DataFetcherStrategy(ABC):
+    # Number of tickers fetch_and_load_stock_data hands to fetch_batch in one call
+    batch_size = 1
+
     @abstractmethod
     def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
         pass
 
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        """
+        Fetches several tickers at once and returns a dict of ticker -> history frame (or None).
+        Strategies that can group requests override this and set batch_size accordingly.
+        """
+        return {
+            ticker_symbol: self.fetch_data(ticker_symbol, start_date_str, end_date_str)
+            for ticker_symbol in ticker_symbols
+        }
+
+    def record_ticker_result(self, ticker_symbol, start_date_str, end_date_str, hist, error=None):
+        """
+        Called once per ticker with the stitched result (or the first error) of a windowed fetch,
+        whose individual windows are requested while in_window_fetch() is set. Decorators that
+        judge a ticker by its results do so here rather than per window, and pass the call on to
+        the strategy they wrap.
+        """
+        inner = getattr(self, "fetcher_strategy", None)
+        if isinstance(inner, DataFetcherStrategy):
+            inner.record_ticker_result(ticker_symbol, start_date_str, end_date_str, hist, error)
+
+def create_yahoo_session(pool_size: int = 10):
+    """
+    Creates a keep-alive HTTP session for Yahoo requests. Uses curl_cffi (yfinance's preferred
+    backend) with a connection cache of pool_size, falling back to a pooled requests.Session.
+    """
+    try:
+        from curl_cffi import CurlOpt
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    return curl_requests.Session(impersonate="chrome", curl_options={CurlOpt.MAXCONNECTS: pool_size})
+
 class YahooFinanceFetcher(DataFetcherStrategy):
+    """
+    Fetches one ticker per call through a single keep-alive session owned by the fetcher and
+    shared by every yf.Ticker it creates, across threads. yfinance keeps the crumb/cookie for
+    the session in process and persists the cookie under cache_dir when one is given.
+    """
+    def __init__(self, session=None, pool_size: int = 10, cache_dir: str = None):
+        self.pool_size = pool_size
+        self._session = session
+        self._session_lock = threading.Lock()
+        if cache_dir:
+            yf.set_tz_cache_location(cache_dir)
+
+    @property
+    def session(self):
+        # Created lazily so module-level default instances don't open sessions at import
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = create_yahoo_session(self.pool_size)
+                    log.info(f"Created shared Yahoo session with pool size {self.pool_size}")
+        return self._session
+
     def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
-        ticker = yf.Ticker(ticker_symbol)
+        ticker = yf.Ticker(ticker_symbol, session=self.session)
         hist = ticker.history(start=start_date_str, end=end_date_str)
         if hist.empty:
             log.warning(f"No data returned for ticker: {ticker_symbol}")
             return None
         return hist
 
+class YahooFinanceBatchFetcher(YahooFinanceFetcher):
+    """
+    Fetches groups of batch_size tickers with a single yf.download call and splits the wide
+    (ticker, field) frame back into per-ticker frames shaped like Ticker.history output.
+    """
+    def __init__(self, batch_size: int = 100, threads: bool = True, **session_kwargs):
+        super().__init__(**session_kwargs)
+        self.batch_size = batch_size
+        self.threads = threads
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return self.fetch_batch([ticker_symbol], start_date_str, end_date_str)[ticker_symbol]
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        data = yf.download(
+            list(ticker_symbols),
+            start=start_date_str,
+            end=end_date_str,
+            group_by="ticker",
+            actions=True,
+            auto_adjust=True,
+            ignore_tz=False,
+            threads=self.threads,
+            progress=False,
+            session=self.session,
+            multi_level_index=True,
+        )
+        returned = set()
+        if data is not None and not data.empty:
+            returned = set(data.columns.get_level_values(0))
+
+        results = {}
+        for ticker_symbol in ticker_symbols:
+            hist = None
+            if ticker_symbol in returned:
+                # The combined frame is aligned on the union of all dates; drop the padding rows
+                hist = data[ticker_symbol].dropna(how="all").copy()
+                hist.columns.name = None
+                if "Volume" in hist.columns and hist["Volume"].notna().all():
+                    hist["Volume"] = hist["Volume"].astype("int64")
+            if hist is None or hist.empty:
+                log.warning(f"No data returned for ticker: {ticker_symbol}")
+                hist = None
+            results[ticker_symbol] = hist
+        return results
+
+class AsyncDataFetcherStrategy(ABC):
+    @abstractmethod
+    async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        pass
+
+class AsyncYahooFinanceFetcher(AsyncDataFetcherStrategy):
+    """
+    Adapter that exposes a blocking DataFetcherStrategy to the async load path by running its
+    fetch_data on a pool of max_workers threads. This is not a single-loop fetcher: every
+    in-flight fetch occupies a thread, and at most max_workers run at once. Use it to reuse
+    sync strategies (e.g. the decorators); AsyncYahooChartFetcher is the native async one.
+    Call close() when done to release the threads.
+    """
+    def __init__(self, fetcher_strategy: DataFetcherStrategy = None, max_workers: int = 10):
+        self.fetcher_strategy = fetcher_strategy or YahooFinanceFetcher(pool_size=max_workers)
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yfinance_async_fetch")
+
+    async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            propagate(partial(self.fetcher_strategy.fetch_data, ticker_symbol, start_date_str, end_date_str)),
+        )
+
+    async def aclose(self):
+        self._executor.shutdown(wait=False)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+YAHOO_CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
+
+class YahooChartError(Exception):
+    """Non-retryable error reported by the Yahoo chart endpoint, other than unknown symbols."""
+
+class AsyncYahooChartFetcher(AsyncDataFetcherStrategy):
+    """
+    Native async fetcher: requests Yahoo's chart endpoint directly on the running event loop
+    through one curl_cffi AsyncSession, so thousands of fetches share a single thread and
+    connection pool instead of a thread each. Returns frames shaped like Ticker.history with
+    its defaults (daily bars, prices adjusted for splits and dividends, Dividends and Stock
+    Splits columns, Date index in the exchange's time zone). Throttled responses raise an
+    error is_throttling_error recognises. Call aclose() when done.
+    """
+    def __init__(self, max_connections: int = 100, session=None, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._session = session
+
+    @property
+    def session(self):
+        # Created on first use so it binds to the loop the fetches run on
+        if self._session is None:
+            from curl_cffi.requests import AsyncSession
+
+            self._session = AsyncSession(impersonate="chrome", max_clients=self.max_connections)
+        return self._session
+
+    async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        params = {
+            "period1": int(pd.Timestamp(start_date_str, tz="UTC").timestamp()),
+            "period2": int(pd.Timestamp(end_date_str, tz="UTC").timestamp()),
+            "interval": "1d",
+            "events": "div,splits",
+            "includeAdjustedClose": "true",
+        }
+        response = await self.session.get(
+            YAHOO_CHART_URL.format(ticker=ticker_symbol), params=params, timeout=self.timeout
+        )
+        if response.status_code == 429:
+            raise YahooChartError(f"Too Many Requests for {ticker_symbol} (HTTP 429)")
+        if response.status_code == 404:
+            log.warning(f"No data returned for ticker: {ticker_symbol}")
+            return None
+        if response.status_code != 200:
+            raise YahooChartError(f"Chart request for {ticker_symbol} failed with HTTP {response.status_code}")
+
+        hist = chart_to_history(response.json())
+        if hist is None:
+            log.warning(f"No data returned for ticker: {ticker_symbol}")
+        return hist
+
+    async def aclose(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+def chart_to_history(payload):
+    """
+    Converts a Yahoo v8 chart response into a Ticker.history-shaped frame, or None when it
+    holds no bars. Raises YahooChartError for errors other than an unknown symbol.
+    """
+    chart = payload.get("chart") or {}
+    error = chart.get("error")
+    if error:
+        if error.get("code") == "Not Found":
+            return None
+        raise YahooChartError(f"{error.get('code')}: {error.get('description')}")
+    result = (chart.get("result") or [None])[0]
+    if not result or not result.get("timestamp"):
+        return None
+
+    tz = result["meta"].get("exchangeTimezoneName", "UTC")
+    quote = result["indicators"]["quote"][0]
+    index = pd.to_datetime(result["timestamp"], unit="s", utc=True).tz_convert(tz).normalize()
+    hist = pd.DataFrame(
+        {column.capitalize(): quote.get(column) for column in ("open", "high", "low", "close", "volume")},
+        index=pd.DatetimeIndex(index, name="Date"),
+        dtype="float64",
+    )
+    hist = hist.dropna(how="all", subset=["Open", "High", "Low", "Close"])
+    hist = hist[~hist.index.duplicated(keep="last")]
+    if hist.empty:
+        return None
+
+    adjclose = (result["indicators"].get("adjclose") or [{}])[0].get("adjclose")
+    if adjclose is not None:
+        adjclose = pd.Series(adjclose, index=index, dtype="float64")
+        adjclose = adjclose[~adjclose.index.duplicated(keep="last")].reindex(hist.index)
+        ratio = adjclose / hist["Close"]
+        for column in ("Open", "High", "Low"):
+            hist[column] = hist[column] * ratio
+        hist["Close"] = adjclose
+
+    events = result.get("events") or {}
+    hist["Dividends"] = _chart_events(events.get("dividends"), tz, hist.index, lambda e: e["amount"])
+    hist["Stock Splits"] = _chart_events(
+        events.get("splits"), tz, hist.index, lambda e: e["numerator"] / e["denominator"]
+    )
+    hist["Volume"] = hist["Volume"].fillna(0).astype("int64")
+    return hist
+
+def _chart_events(events, tz, index, value):
+    values = pd.Series(0.0, index=index)
+    for event in (events or {}).values():
+        day = pd.Timestamp(event["date"], unit="s", tz="UTC").tz_convert(tz).normalize()
+        if day in values.index:
+            values[day] = value(event)
+    return values
+
 class SnowflakeConnectionFactory:
+    """
+    Creates Snowflake connections and keeps a small per-connection-id pool of idle ones, so a
+    task reuses one authenticated session across flushes instead of reconnecting each time.
+    Connections idle for longer than health_check_after_seconds are probed with SELECT 1 before
+    reuse. The load entry points call close_all() when their run is done; stats() reports
+    connections opened and the time spent opening them.
+    """
+    health_check_after_seconds = 60.0
+    connections_opened = 0
+    connect_seconds = 0.0
+    _idle = {}
+    _lock = threading.Lock()
+
     @staticmethod
     def create_connection(snowflake_conn_id):
-        hook = SnowflakeHook(snowflake_conn_id=snowflake_conn_id)
-        return hook.get_conn()
+        started = time.perf_counter()
+        with get_tracer().span("snowflake.connect", conn_id=snowflake_conn_id):
+            hook = SnowflakeHook(snowflake_conn_id=snowflake_conn_id)
+            conn = hook.get_conn()
+        elapsed = time.perf_counter() - started
+        get_metrics().timing("snowflake.connect", elapsed)
+        with SnowflakeConnectionFactory._lock:
+            SnowflakeConnectionFactory.connections_opened += 1
+            SnowflakeConnectionFactory.connect_seconds += elapsed
+        log.info(f"Opened Snowflake connection in {elapsed:.2f}s")
+        return conn
+
+    @classmethod
+    @contextmanager
+    def connection(cls, snowflake_conn_id):
+        """
+        Borrows a pooled connection for the duration of the block. Connections are returned to
+        the pool on success and closed if the block raises, since their state is unknown.
+        """
+        conn = cls._checkout(snowflake_conn_id)
+        try:
+            yield conn
+        except BaseException:
+            cls._close_quietly(conn)
+            raise
+        with cls._lock:
+            cls._idle.setdefault(snowflake_conn_id, []).append((conn, time.monotonic()))
+
+    @classmethod
+    def _checkout(cls, snowflake_conn_id):
+        while True:
+            with cls._lock:
+                idle = cls._idle.get(snowflake_conn_id)
+                if not idle:
+                    break
+                conn, last_used = idle.pop()
+            if cls._is_healthy(conn, time.monotonic() - last_used):
+                return conn
+            log.info("Discarding unhealthy pooled Snowflake connection.")
+            cls._close_quietly(conn)
+        return cls.create_connection(snowflake_conn_id)
+
+    @classmethod
+    def _is_healthy(cls, conn, idle_seconds):
+        try:
+            if conn.is_closed():
+                return False
+            if idle_seconds > cls.health_check_after_seconds:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                finally:
+                    cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception as e:
+            log.warning(f"Error closing Snowflake connection: {e}")
+
+    @classmethod
+    def close_all(cls):
+        with cls._lock:
+            idle = [conn for conns in cls._idle.values() for conn, _ in conns]
+            cls._idle.clear()
+        for conn in idle:
+            cls._close_quietly(conn)
+        if idle:
+            log.info(f"Closed {len(idle)} pooled Snowflake connection(s).")
+
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            return {
+                "connections_opened": cls.connections_opened,
+                "connect_seconds": cls.connect_seconds,
+                "idle_connections": sum(len(conns) for conns in cls._idle.values()),
+            }
+
+LOAD_MODES = ("write_pandas", "copy_into", "merge")
+
+# Natural key of PRICE_HISTORY rows, used by the "merge" load mode
+MERGE_KEY_COLUMNS = ("TICKER", "DATE")
+
+# Per-run load timestamp (UTC), attached to each batch as a TIMESTAMP_NTZ constant at load time
+LOAD_TIMESTAMP_COLUMN = "LOADTIMESTAMP"
+LOAD_TIMESTAMP_FORMAT = "YYYY-MM-DD HH:mm:ss.SSSSSS"
+
+
+def _column_names(data):
+    """Column names of a DataFrame or pyarrow Table."""
+    return list(data.column_names) if isinstance(data, pa.Table) else list(data.columns)
+
+
+def _spool_parquet_files(df, spool_dir, target_file_bytes):
+    """
+    Writes df (a DataFrame or pyarrow Table) as zstd-compressed Parquet files of roughly
+    target_file_bytes each and returns (paths, total_bytes). The compressed size isn't known up
+    front, so rows per file start from the in-memory row size and are rescaled from each file
+    actually written. Tables are sliced and written without converting back to pandas.
+    """
+    is_table = isinstance(df, pa.Table)
+    in_memory_bytes = df.nbytes if is_table else int(df.memory_usage(deep=True).sum())
+    row_bytes = max(1, in_memory_bytes // max(1, len(df)))
+    rows_per_file = max(1, target_file_bytes // row_bytes)
+    paths = []
+    total_bytes = 0
+    start = 0
+    while start < len(df):
+        path = os.path.join(spool_dir, f"part_{len(paths):05d}.parquet")
+        if is_table:
+            chunk = df.slice(start, rows_per_file)
+            pq.write_table(
+                chunk, path, compression="zstd", coerce_timestamps="us", allow_truncated_timestamps=True
+            )
+        else:
+            chunk = df.iloc[start:start + rows_per_file]
+            chunk.to_parquet(
+                path,
+                index=False,
+                compression="zstd",
+                coerce_timestamps="us",
+                allow_truncated_timestamps=True,
+            )
+        size = os.path.getsize(path)
+        paths.append(path)
+        total_bytes += size
+        start += len(chunk)
+        rows_per_file = max(1, int(len(chunk) * target_file_bytes / max(1, size)))
+    return paths, total_bytes
 
-def write_snowflake(all_data, snowflake_conn_id, database, schema, table_name, chunk_size):
-    # Combine dataframes
-    combined_df = pd.concat(all_data, ignore_index=True)
-    log.info(f"Combined DataFrame shape: {combined_df.shape}")
 
-    # Ensure column names match Snowflake table (case-insensitive by default with write_pandas)
-    # Quote column names with spaces to avoid SQL syntax errors
-    combined_df.columns = combined_df.columns.str.replace(" ", "_").str.upper()
+def copy_into_snowflake(
+    conn,
+    df,
+    database,
+    schema,
+    table_name,
+    stage=None,
+    spool_dir=None,
+    target_file_bytes=64 * 1024 ** 2,
+    put_parallel=8,
+    load_timestamp=None,
+):
+    """
+    Bulk loads df by spooling it to compressed Parquet files, PUTting them in parallel to the
+    table stage (or to the named stage, if given) under a per-batch prefix, and running a single
+    COPY INTO for that prefix. If load_timestamp is given, the COPY sets LOAD_TIMESTAMP_COLUMN to
+    it as a typed constant, so the value is never stored per row in the files. Returns a dict
+    with the files, bytes and rows loaded.
+    """
+    table = f"{database.upper()}.{schema.upper()}.{table_name.upper()}"
+    stage_location = f"@{stage}" if stage else f"@{database.upper()}.{schema.upper()}.%{table_name.upper()}"
+    batch_prefix = f"yfinance_{uuid.uuid4().hex}"
+
+    spool = tempfile.mkdtemp(prefix=f"{batch_prefix}_", dir=spool_dir)
+    try:
+        metrics = get_metrics()
+        tracer = get_tracer()
+        with metrics.timer("load.spool"), tracer.span("snowflake.spool", rows=len(df)) as span:
+            paths, total_bytes = _spool_parquet_files(df, spool, target_file_bytes)
+            span.set(files=len(paths), bytes=total_bytes)
+        cursor = conn.cursor()
+        try:
+            with metrics.timer("load.put"), tracer.span("snowflake.put", files=len(paths), bytes=total_bytes):
+                cursor.execute(
+                    f"PUT 'file://{spool}/*.parquet' {stage_location}/{batch_prefix}/ "
+                    f"PARALLEL={put_parallel} AUTO_COMPRESS=FALSE OVERWRITE=TRUE"
+                )
+            with metrics.timer("load.copy"), tracer.span("snowflake.copy", table=table, files=len(paths)):
+                if load_timestamp is None:
+                    cursor.execute(
+                        f"COPY INTO {table} FROM {stage_location}/{batch_prefix}/ "
+                        "FILE_FORMAT=(TYPE=PARQUET USE_LOGICAL_TYPE=TRUE) "
+                        "MATCH_BY_COLUMN_NAME=CASE_INSENSITIVE PURGE=TRUE"
+                    )
+                else:
+                    # MATCH_BY_COLUMN_NAME can't be combined with a transformation, so map columns explicitly
+                    columns = _column_names(df)
+                    select_list = ", ".join(f'$1:"{c}"' for c in columns)
+                    cursor.execute(
+                        f"COPY INTO {table} ({', '.join(columns)}, {LOAD_TIMESTAMP_COLUMN}) FROM ("
+                        f"SELECT {select_list}, "
+                        f"'{load_timestamp}'::TIMESTAMP_NTZ FROM {stage_location}/{batch_prefix}/) "
+                        "FILE_FORMAT=(TYPE=PARQUET USE_LOGICAL_TYPE=TRUE) PURGE=TRUE"
+                    )
+                copy_results = cursor.fetchall()
+        finally:
+            cursor.close()
+    finally:
+        shutil.rmtree(spool, ignore_errors=True)
+
+    # COPY INTO returns one row per file: (file, status, rows_parsed, rows_loaded, ...)
+    rows_loaded = sum(row[3] for row in copy_results if len(row) > 3)
+    report = {"files": len(paths), "bytes": total_bytes, "rows": rows_loaded}
+    log.info(
+        f"COPY INTO {table} loaded {rows_loaded} rows from {len(paths)} files "
+        f"({total_bytes} bytes) staged at {stage_location}/{batch_prefix}/"
+    )
+    return report
+
+
+def merge_into_snowflake(conn, df, database, schema, table_name, stage=None, load_timestamp=None):
+    """
+    Idempotently upserts df into the target table keyed on MERGE_KEY_COLUMNS. The batch is bulk
+    loaded into a transient staging table cloned from the target's structure, then MERGEd so
+    that new keys are inserted and existing keys are updated only when a value has changed.
+    Inserted and updated rows get load_timestamp, if given, as a constant in the MERGE itself.
+    The staging table is dropped afterwards. Returns a dict with rows inserted and updated.
+    """
+    target = f"{database.upper()}.{schema.upper()}.{table_name.upper()}"
+    staging_name = f"{table_name.upper()}_STAGE_{uuid.uuid4().hex[:12].upper()}"
+    staging = f"{database.upper()}.{schema.upper()}.{staging_name}"
+    key_columns = list(MERGE_KEY_COLUMNS)
+    columns = _column_names(df)
+    value_columns = [c for c in columns if c not in key_columns and c != LOAD_TIMESTAMP_COLUMN]
+    update_values = {c: f"src.{c}" for c in columns if c not in key_columns}
+    insert_values = {c: f"src.{c}" for c in columns}
+    if load_timestamp is not None:
+        update_values[LOAD_TIMESTAMP_COLUMN] = insert_values[LOAD_TIMESTAMP_COLUMN] = (
+            f"'{load_timestamp}'::TIMESTAMP_NTZ"
+        )
+
+    on_clause = " AND ".join(f"tgt.{c} = src.{c}" for c in key_columns)
+    changed_clause = " OR ".join(f"tgt.{c} IS DISTINCT FROM src.{c}" for c in value_columns) or "FALSE"
+    merge_sql = (
+        f"MERGE INTO {target} AS tgt USING ("
+        f"SELECT * FROM {staging} "
+        f"QUALIFY ROW_NUMBER() OVER (PARTITION BY {', '.join(key_columns)} ORDER BY {key_columns[0]}) = 1"
+        f") AS src ON {on_clause} "
+        f"WHEN MATCHED AND ({changed_clause}) THEN UPDATE SET "
+        + ", ".join(f"tgt.{c} = {value}" for c, value in update_values.items())
+        + f" WHEN NOT MATCHED THEN INSERT ({', '.join(insert_values)}) "
+        f"VALUES ({', '.join(insert_values.values())})"
+    )
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"CREATE TRANSIENT TABLE {staging} LIKE {target}")
+        try:
+            copy_into_snowflake(conn, df, database, schema, staging_name, stage=stage)
+            with get_metrics().timer("load.merge"), get_tracer().span("snowflake.merge", rows=len(df)):
+                cursor.execute(merge_sql)
+                result = cursor.fetchone() or (0, 0)
+        finally:
+            cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    finally:
+        cursor.close()
+
+    # MERGE returns (number of rows inserted, number of rows updated)
+    report = {"rows_inserted": result[0], "rows_updated": result[1]}
+    log.info(
+        f"MERGE into {target} inserted {report['rows_inserted']} and updated {report['rows_updated']} "
+        f"of {len(df)} staged rows"
+    )
+    return report
+
+
+def _normalize_frame(frame):
+    """Renames columns to Snowflake names and compacts DATE and VOLUME in one fetched frame."""
+    frame = frame.rename(columns=lambda c: str(c).replace(" ", "_").upper())
+
+    # Normalizing per frame also keeps concat from falling back to object dtype when
+    # exchanges report dates in different time zones
+    if "DATE" in frame and isinstance(frame["DATE"].dtype, pd.DatetimeTZDtype):
+        frame["DATE"] = frame["DATE"].dt.tz_convert("UTC").dt.tz_localize(None)
+    if "VOLUME" in frame and pd.api.types.is_integer_dtype(frame["VOLUME"]):
+        frame["VOLUME"] = pd.to_numeric(frame["VOLUME"], downcast="integer")
+    return frame
+
+
+def normalize_frames(frames):
+    """
+    Combines fetched frames into one compact DataFrame for upload. Column names are uppercased
+    with spaces replaced by underscores, DATE is converted to naive UTC (the value Parquet
+    logical-type loads store) in one vectorized pass per frame, VOLUME is downcast to the
+    smallest integer type holding its values, and TICKER becomes a categorical shared by all
+    frames. Price columns keep full float64 precision. Logs the in-memory bytes saved.
+    """
+    bytes_before = 0
+    tickers = []
+    parts = []
+    for frame in frames:
+        bytes_before += int(frame.memory_usage(index=True, deep=True).sum())
+        frame = _normalize_frame(frame)
+        if "TICKER" in frame:
+            tickers.append(pd.Categorical(frame["TICKER"]))
+            frame = frame.drop(columns="TICKER")
+        parts.append(frame)
+
+    combined_df = pd.concat(parts, ignore_index=True)
+    if len(tickers) == len(parts):
+        combined_df["TICKER"] = union_categoricals(tickers)
+    elif tickers:
+        raise ValueError("TICKER column is missing from some frames")
+
+    bytes_after = int(combined_df.memory_usage(index=True, deep=True).sum())
+    log.info(
+        f"Normalized {len(combined_df)} rows from {len(parts)} frames: {bytes_before / 1024 ** 2:.1f} MB -> "
+        f"{bytes_after / 1024 ** 2:.1f} MB ({bytes_before - bytes_after} bytes saved)"
+    )
+    return combined_df
+
+
+def history_to_arrow(hist):
+    """
+    Converts one prepared history frame to a pyarrow Table with the same normalization as
+    normalize_frames, with TICKER dictionary-encoded. Used by the arrow_native load path.
+    """
+    table = pa.Table.from_pandas(_normalize_frame(hist), preserve_index=False)
+    if "TICKER" in table.column_names:
+        index = table.column_names.index("TICKER")
+        table = table.set_column(index, "TICKER", table.column(index).dictionary_encode())
+    return table
+
+
+def concat_arrow_tables(tables):
+    """
+    Combines per-ticker Arrow tables into one chunked table without copying columns whose types
+    already match; differing VOLUME widths or optional columns are promoted as needed.
+    """
+    combined = pa.concat_tables(tables, promote_options="permissive")
+    log.info(
+        f"Combined {len(tables)} Arrow tables into {combined.num_rows} rows "
+        f"({combined.nbytes / 1024 ** 2:.1f} MB)"
+    )
+    return combined
+
+
+def write_snowflake(
+    all_data,
+    snowflake_conn_id,
+    database,
+    schema,
+    table_name,
+    chunk_size,
+    load_mode="write_pandas",
+    stage=None,
+    load_timestamp=None,
+):
+    if load_mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load_mode {load_mode!r}; expected one of {LOAD_MODES}")
+
+    metrics = get_metrics()
+    tracer = get_tracer()
+    concat_started = time.perf_counter()
+    with tracer.span("snowflake.concat", frames=len(all_data)) as span:
+        if all_data and all(isinstance(part, pa.Table) for part in all_data):
+            if load_mode == "write_pandas":
+                raise ValueError("Arrow tables can only be loaded with load_mode 'copy_into' or 'merge'")
+            combined_df = concat_arrow_tables(all_data)
+        else:
+            # Combine dataframes into one compact frame with Snowflake column names
+            combined_df = normalize_frames(all_data)
+        if tracer.enabled:
+            span.set(rows=len(combined_df), bytes=_frame_nbytes(combined_df))
+    metrics.timing("load.concat", time.perf_counter() - concat_started)
+    log.info(f"Combined data shape: {combined_df.shape}")
 
     log.info(
         f"Attempting to load {combined_df.shape[0]} rows into Snowflake table {database}.{schema}.{table_name}"
     )
-    print(combined_df.columns)
+    log.debug(f"Columns: {_column_names(combined_df)}")
 
-    conn = None  # Initialize conn to avoid unbound variable error
+    tags = {"mode": load_mode}
     try:
-        # Get Snowflake connection using factory
-        conn = SnowflakeConnectionFactory.create_connection(snowflake_conn_id)
+        # Borrow a pooled Snowflake connection from the factory
+        with SnowflakeConnectionFactory.connection(snowflake_conn_id) as conn:
+            with metrics.timer("load.duration", tags), tracer.span(
+                "snowflake.load", mode=load_mode, table=table_name, rows=len(combined_df)
+            ):
+                report = _load_dataframe(
+                    conn, combined_df, database, schema, table_name, chunk_size, load_mode, stage, load_timestamp
+                )
+    except Exception as e:
+        metrics.increment("load.failures", tags={**tags, "error": type(e).__name__})
+        log.error(f"Error loading data into Snowflake: {e}")
+        raise AirflowException(f"Snowflake loading error: {e}")
+    metrics.histogram("load.rows", len(combined_df), tags)
+    return report
 
-        # Use write_pandas for efficient bulk loading from DataFrame
-        # Note: This performs individual INSERT statements in batches behind the scenes,
-        # it's NOT using COPY INTO. For very large volumes, staging + COPY INTO is faster.
+
+def _load_dataframe(conn, combined_df, database, schema, table_name, chunk_size, load_mode, stage, load_timestamp):
+    if load_mode == "merge":
+        # Stage into a transient table and upsert on (TICKER, DATE)
+        return merge_into_snowflake(
+            conn=conn,
+            df=combined_df,
+            database=database,
+            schema=schema,
+            table_name=table_name,
+            stage=stage,
+            load_timestamp=load_timestamp,
+        )
+
+    if load_mode == "copy_into":
+        # Stage compressed Parquet files and load them with a single COPY INTO
+        return copy_into_snowflake(
+            conn=conn,
+            df=combined_df,
+            database=database,
+            schema=schema,
+            table_name=table_name,
+            stage=stage,
+            load_timestamp=load_timestamp,
+        )
+
+    if load_timestamp is not None:
+        # write_pandas can't add server-side constants; a typed datetime column compresses to
+        # almost nothing in its Parquet chunks and only lives for this upload
+        combined_df[LOAD_TIMESTAMP_COLUMN] = pd.Timestamp(load_timestamp)
+
+    # Use write_pandas for efficient bulk loading from DataFrame
+    # Note: This performs individual INSERT statements in batches behind the scenes,
+    # it's NOT using COPY INTO. For very large volumes, use load_mode="copy_into".
+    with get_tracer().span("snowflake.write_pandas", rows=len(combined_df), chunk_size=chunk_size):
         success, nchunks, nrows, _ = write_pandas(
             conn=conn,
             df=combined_df,
@@ -70,23 +759,467 @@ def write_snowflake(all_data, snowflake_conn_id, database, schema, table_name, c
             use_logical_type=True,  # Ensure proper handling of datetime with timezone
         )
 
-        if success:
-            log.info(f"Successfully loaded {nrows} rows in {nchunks} chunks.")
+    if success:
+        log.info(f"Successfully loaded {nrows} rows in {nchunks} chunks.")
+    else:
+        # This part might not be reached if write_pandas raises an exception on failure
+        log.error("Snowflake write_pandas reported failure.")
+        raise AirflowException("Snowflake write_pandas failed.")
+
+
+class FlushPolicy:
+    """
+    Decides when buffered frames are written to Snowflake: once they reach max_rows rows,
+    roughly max_bytes of in-memory size, or max_seconds since the first frame was buffered,
+    whichever comes first. A limit of None disables that trigger. Fetch errors never force a
+    flush, so a bad upstream day produces the same load sizes as a clean one.
+    """
+
+    def __init__(
+        self,
+        max_rows: int | None = 250_000,
+        max_bytes: int | None = 256 * 1024 ** 2,
+        max_seconds: float | None = 300.0,
+    ):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+
+    def trigger(self, rows, nbytes, elapsed_seconds):
+        """Returns the reason buffered data must be flushed now, or None."""
+        if self.max_rows is not None and rows >= self.max_rows:
+            return "rows"
+        if self.max_bytes is not None and nbytes >= self.max_bytes:
+            return "bytes"
+        if self.max_seconds is not None and elapsed_seconds >= self.max_seconds:
+            return "elapsed"
+        return None
+
+
+def _frame_nbytes(hist):
+    """In-memory size of a fetched DataFrame or pyarrow Table."""
+    if isinstance(hist, pa.Table):
+        return hist.nbytes
+    return int(hist.memory_usage(index=True, deep=True).sum())
+
+
+class _FlushBuffer:
+    """Accumulates fetched frames and their estimated size for a FlushPolicy."""
+
+    def __init__(self, flush_policy: FlushPolicy):
+        self.flush_policy = flush_policy
+        self.frames = []
+        self.rows = 0
+        self.bytes = 0
+        self._started = None
+
+    def add(self, hist):
+        """Buffers hist and returns the flush trigger reason, if any."""
+        if self._started is None:
+            self._started = time.monotonic()
+        self.frames.append(hist)
+        self.rows += len(hist)
+        self.bytes += _frame_nbytes(hist)
+        return self.flush_policy.trigger(self.rows, self.bytes, time.monotonic() - self._started)
+
+    def seconds_until_due(self):
+        """Seconds until the time trigger fires, or None if there is nothing to wait for."""
+        if self._started is None or self.flush_policy.max_seconds is None:
+            return None
+        return max(0.0, self.flush_policy.max_seconds - (time.monotonic() - self._started))
+
+    def drain(self, reason):
+        frames, rows, nbytes = self.frames, self.rows, self.bytes
+        log.info(
+            f"Flushing {rows} rows ({nbytes / 1024 ** 2:.1f} MB in memory) from {len(frames)} frames "
+            f"to Snowflake; trigger: {reason}"
+        )
+        self.frames = []
+        self.rows = 0
+        self.bytes = 0
+        self._started = None
+        return frames
+
+
+class StreamingSink:
+    """
+    Drains fetched frames from a bounded queue on a background thread and hands them to
+    write_batch whenever flush_policy triggers, so fetching and uploading overlap and memory
+    stays bounded by the queue size plus one micro-batch. The time trigger fires even while no
+    new frames arrive. put() blocks while the queue is full. If a write fails, the sink keeps
+    draining (and dropping) frames so producers never deadlock, and the error is re-raised from
+    the next put() or from close().
+    """
+
+    _DONE = object()
+
+    def __init__(self, write_batch, max_queue_size: int = 32, flush_policy: FlushPolicy | None = None):
+        self.write_batch = write_batch
+        self.flush_policy = flush_policy or FlushPolicy()
+        self.rows_written = 0
+        self.batches_written = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = threading.Thread(target=propagate(self._run), name="snowflake_sink", daemon=True)
+        self._thread.start()
+
+    def put(self, hist):
+        if self.error is not None:
+            raise self.error
+        self._queue.put(hist)
+
+    def close(self):
+        self._queue.put(self._DONE)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        buffer = _FlushBuffer(self.flush_policy)
+        while True:
+            try:
+                item = self._queue.get(timeout=buffer.seconds_until_due())
+            except queue.Empty:
+                self._flush(buffer, "elapsed")
+                continue
+            if item is self._DONE:
+                self._flush(buffer, "final")
+                return
+            if self.error is not None:
+                continue
+            reason = buffer.add(item)
+            if reason is not None:
+                self._flush(buffer, reason)
+
+    def _flush(self, buffer, reason):
+        if not buffer.frames or self.error is not None:
+            return
+        rows = buffer.rows
+        frames = buffer.drain(reason)
+        try:
+            self.write_batch(all_data=frames)
+            self.rows_written += rows
+            self.batches_written += 1
+        except Exception as e:
+            log.error(f"Streaming sink failed to write micro-batch of {rows} rows: {e}")
+            self.error = e
+
+
+def get_ticker_watermarks(snowflake_conn_id, database, schema, table_name):
+    """
+    Returns a dict of ticker -> latest DATE already loaded into the table, using a single
+    aggregate query over all tickers.
+    """
+    query = (
+        f"SELECT TICKER, MAX(DATE) FROM {database.upper()}.{schema.upper()}.{table_name.upper()} "
+        "GROUP BY TICKER"
+    )
+    try:
+        with SnowflakeConnectionFactory.connection(snowflake_conn_id) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+    except Exception as e:
+        log.error(f"Error reading load watermarks from Snowflake: {e}")
+        raise AirflowException(f"Snowflake watermark query error: {e}")
+
+    watermarks = {ticker: max_date for ticker, max_date in rows if max_date is not None}
+    log.info(f"Found load watermarks for {len(watermarks)} tickers.")
+    return watermarks
+
+
+def get_incremental_start_dates(tickers, watermarks, default_start_date_str):
+    """
+    Maps each ticker to the day after its watermark. Tickers without loaded history fall back
+    to default_start_date_str for a full backfill.
+    """
+    start_dates = {}
+    for ticker_symbol in tickers:
+        watermark = watermarks.get(ticker_symbol)
+        if watermark is None:
+            start_dates[ticker_symbol] = default_start_date_str
         else:
-            # This part might not be reached if write_pandas raises an exception on failure
-            log.error("Snowflake write_pandas reported failure.")
-            raise AirflowException("Snowflake write_pandas failed.")
+            start_dates[ticker_symbol] = (watermark + timedelta(days=1)).strftime("%Y-%m-%d")
+    return start_dates
+
 
+def shard_tickers(tickers, num_shards):
+    """
+    Splits tickers into num_shards lists using a stable CRC32 hash, so a ticker always lands in
+    the same shard across runs and workers. Empty shards are kept to keep shard indices stable.
+    """
+    shards = [[] for _ in range(num_shards)]
+    for ticker_symbol in tickers:
+        shards[zlib.crc32(ticker_symbol.encode("utf-8")) % num_shards].append(ticker_symbol)
+    return shards
+
+
+def _prepare_history(hist, ticker_symbol):
+    if hist is None:
+        return None
+
+    hist["TICKER"] = ticker_symbol
+    hist.reset_index(inplace=True)
+    return hist
+
+
+def _fetch_tickers(fetcher_strategy, ticker_symbols, start_date_str, end_date_str):
+    """
+    Fetches one batch of tickers and returns a list of (ticker_symbol, hist, error). A failure of
+    the whole request is reported against every ticker in the batch.
+    """
+    tracer = get_tracer()
+    started = time.perf_counter()
+    try:
+        with tracer.span(
+            "yfinance.fetch", tickers=",".join(ticker_symbols), start=start_date_str, end=end_date_str
+        ) as span:
+            if len(ticker_symbols) == 1:
+                histories = {
+                    ticker_symbols[0]: fetcher_strategy.fetch_data(ticker_symbols[0], start_date_str, end_date_str)
+                }
+            else:
+                histories = fetcher_strategy.fetch_batch(ticker_symbols, start_date_str, end_date_str)
+            span.set(rows=sum(len(hist) for hist in histories.values() if hist is not None))
     except Exception as e:
-        log.error(f"Error loading data into Snowflake: {e}")
-        raise AirflowException(f"Snowflake loading error: {e}")
+        return [(ticker_symbol, None, e) for ticker_symbol in ticker_symbols]
     finally:
-        # Ensure connection is closed
-        if "conn" in locals() and conn is not None:
-            conn.close()
-            log.info("Snowflake connection closed.")    
+        _record_fetch_latency(time.perf_counter() - started, len(ticker_symbols))
+
+    results = []
+    for ticker_symbol in ticker_symbols:
+        try:
+            hist = _traced_prepare_history(histories.get(ticker_symbol), ticker_symbol)
+            results.append((ticker_symbol, hist, None))
+        except Exception as e:
+            results.append((ticker_symbol, None, e))
+    return results
+
+
+def _traced_prepare_history(hist, ticker_symbol):
+    tracer = get_tracer()
+    if hist is None or not tracer.enabled:
+        return _prepare_history(hist, ticker_symbol)
+    with tracer.span("yfinance.transform", ticker=ticker_symbol, rows=len(hist)) as span:
+        hist = _prepare_history(hist, ticker_symbol)
+        span.set(bytes=_frame_nbytes(hist))
+    return hist
+
+
+async def _fetch_ticker_async(fetcher_strategy, semaphore, ticker_symbol, start_date_str, end_date_str):
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            with get_tracer().span("yfinance.fetch", tickers=ticker_symbol, start=start_date_str, end=end_date_str):
+                hist = await fetcher_strategy.fetch_data(ticker_symbol, start_date_str, end_date_str)
+            return ticker_symbol, _traced_prepare_history(hist, ticker_symbol), None
+        except Exception as e:
+            return ticker_symbol, None, e
+        finally:
+            _record_fetch_latency(time.perf_counter() - started, 1)
+
+
+def _record_fetch_latency(seconds, num_tickers):
+    # Batched requests report the request latency once per ticker they covered
+    metrics = get_metrics()
+    for _ in range(num_tickers):
+        metrics.timing("fetch.latency", seconds, {"batched": str(num_tickers > 1).lower()})
+
+
+def _iter_fetch_results(tickers, fetcher_strategy, start_dates, end_date_str, max_workers):
+    """
+    Yields (ticker_symbol, hist, error) for every ticker. Tickers sharing a start date are grouped
+    into batches of fetcher_strategy.batch_size. With max_workers > 1 the batches run on a bounded
+    thread pool and results are yielded in completion order rather than ticker order.
+    """
+    batch_size = max(1, fetcher_strategy.batch_size)
+    tickers_by_start = {}
+    for ticker_symbol in tickers:
+        tickers_by_start.setdefault(start_dates[ticker_symbol], []).append(ticker_symbol)
+    batches = [
+        (start_date_str, group[i:i + batch_size])
+        for start_date_str, group in tickers_by_start.items()
+        for i in range(0, len(group), batch_size)
+    ]
+
+    if max_workers <= 1:
+        for start_date_str, batch in batches:
+            yield from _fetch_tickers(fetcher_strategy, batch, start_date_str, end_date_str)
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yfinance_fetch")
+    try:
+        tasks = (
+            (None, _fetch_tickers, fetcher_strategy, batch, start_date_str, end_date_str)
+            for start_date_str, batch in batches
+        )
+        for _, future in _iter_bounded(executor, tasks, 2 * max_workers):
+            yield from future.result()
+    finally:
+        # Drop queued batches if the consumer stops early, e.g. on FetchAbortedError
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_bounded(executor, tasks, max_pending):
+    """
+    Submits (tag, fn, *args) tasks to executor lazily and yields (tag, future) in completion
+    order, keeping at most max_pending tasks submitted but not yet handed to the caller. A slow
+    consumer therefore holds back the fetches instead of piling up their results, and yielded
+    futures aren't referenced here any more, so their results are freed once the caller is done.
+    """
+    tasks = iter(tasks)
+    pending = {}
+    while True:
+        while len(pending) < max_pending:
+            task = next(tasks, None)
+            if task is None:
+                break
+            tag, fn, *args = task
+            pending[executor.submit(propagate(fn), *args)] = tag
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        while done:
+            future = done.pop()
+            yield pending.pop(future), future
+        del future
+
+
+def _split_date_range(start_date_str, end_date_str, num_windows, min_window_days=MIN_DATE_WINDOW_DAYS):
+    """
+    Splits [start, end) into up to num_windows contiguous ranges of at least min_window_days each.
+    """
+    start = date.fromisoformat(start_date_str)
+    end = date.fromisoformat(end_date_str)
+    days = (end - start).days
+    num_windows = max(1, min(num_windows, days // min_window_days))
+    bounds = [start + timedelta(days=round(i * days / num_windows)) for i in range(num_windows + 1)]
+    return [(bounds[i].isoformat(), bounds[i + 1].isoformat()) for i in range(num_windows)]
+
+
+def _stitch_windows(parts):
+    """Concatenates per-window frames in date order, dropping rows repeated at window boundaries."""
+    if not parts:
+        return None
+    hist = pd.concat(parts)
+    return hist[~hist.index.duplicated(keep="last")].sort_index()
+
+
+def _iter_windowed_fetch_results(tickers, fetcher_strategy, start_dates, end_date_str, max_workers, date_windows):
+    """
+    Yields (ticker_symbol, hist, error) like _iter_fetch_results, but splits each ticker's range
+    into date windows that are fetched concurrently and stitched back together. A ticker is
+    yielded once all of its windows are done; any failed window fails the whole ticker. The
+    per-ticker outcome of a split range is reported to fetcher_strategy.record_ticker_result;
+    a ticker whose range fits in one window is fetched and judged like a plain fetch.
+    """
+    windows = {
+        ticker_symbol: _split_date_range(start_dates[ticker_symbol], end_date_str, date_windows)
+        for ticker_symbol in tickers
+    }
+    split = {ticker_symbol for ticker_symbol, ticker_windows in windows.items() if len(ticker_windows) > 1}
+    remaining = {ticker_symbol: len(ticker_windows) for ticker_symbol, ticker_windows in windows.items()}
+    parts = {ticker_symbol: [] for ticker_symbol in tickers}
+
+    max_workers = max(1, max_workers)
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yfinance_fetch")
+    try:
+        # A ticker's windows are submitted together, so few partly fetched tickers are held at once
+        tasks = (
+            (
+                ticker_symbol, _fetch_window, fetcher_strategy, ticker_symbol, window_start, window_end,
+                ticker_symbol in split,
+            )
+            for ticker_symbol, ticker_windows in windows.items()
+            for window_start, window_end in ticker_windows
+            if ticker_symbol in remaining  # Skip the rest of a ticker that already failed
+        )
+        for ticker_symbol, future in _iter_bounded(executor, tasks, 2 * max_workers):
+            if ticker_symbol not in remaining:
+                continue  # Already reported as failed
+            try:
+                hist = future.result()
+            except Exception as e:
+                del remaining[ticker_symbol]
+                parts.pop(ticker_symbol)
+                if ticker_symbol in split:
+                    fetcher_strategy.record_ticker_result(
+                        ticker_symbol, start_dates[ticker_symbol], end_date_str, None, e
+                    )
+                yield ticker_symbol, None, e
+                continue
+
+            if hist is not None and not hist.empty:
+                parts[ticker_symbol].append(hist)
+            remaining[ticker_symbol] -= 1
+            if remaining[ticker_symbol] == 0:
+                del remaining[ticker_symbol]
+                hist = _stitch_windows(parts.pop(ticker_symbol))
+                if ticker_symbol in split:
+                    fetcher_strategy.record_ticker_result(ticker_symbol, start_dates[ticker_symbol], end_date_str, hist)
+                try:
+                    hist = _traced_prepare_history(hist, ticker_symbol)
+                    yield ticker_symbol, hist, None
+                except Exception as e:
+                    yield ticker_symbol, None, e
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _fetch_window(fetcher_strategy, ticker_symbol, window_start, window_end, partial=True):
+    # Only a window that is part of a split range is judged on the stitched result instead
+    token = _window_fetch.set(partial)
+    try:
+        with get_metrics().timer("fetch.window_latency"), get_tracer().span(
+            "yfinance.fetch", tickers=ticker_symbol, start=window_start, end=window_end
+        ):
+            return fetcher_strategy.fetch_data(ticker_symbol, window_start, window_end)
+    finally:
+        _window_fetch.reset(token)
+
+
+def _resolve_start_dates(tickers, start_date_str, end_date_str, start_dates):
+    """
+    Returns ticker -> start date, applying per-ticker overrides and dropping tickers that are
+    already up to date for the requested end date.
+    """
+    resolved = {}
+    for ticker_symbol in tickers:
+        ticker_start = (start_dates or {}).get(ticker_symbol, start_date_str)
+        if ticker_start >= end_date_str:
+            log.info(f"Skipping {ticker_symbol}: already loaded up to {end_date_str}")
+            continue
+        resolved[ticker_symbol] = ticker_start
+    return resolved
+
+
+def _traced(name):
+    """Runs the decorated loader entry point inside a root span carrying its ticker count."""
+
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+
+            @wraps(fn)
+            async def async_wrapper(tickers, *args, **kwargs):
+                with get_tracer().span(name, tickers=len(tickers)):
+                    return await fn(tickers, *args, **kwargs)
+
+            return async_wrapper
 
+        @wraps(fn)
+        def wrapper(tickers, *args, **kwargs):
+            with get_tracer().span(name, tickers=len(tickers)):
+                return fn(tickers, *args, **kwargs)
 
+        return wrapper
+
+    return decorator
+
+
+@_traced("fetch_and_load")
 def fetch_and_load_stock_data(
     tickers: list[str],
     snowflake_conn_id: str,
@@ -97,6 +1230,17 @@ def fetch_and_load_stock_data(
     end_date_str: str,
     chunk_size: int = 10000,
     fetcher_strategy: DataFetcherStrategy = YahooFinanceFetcher(),
+    max_workers: int = 1,
+    start_dates: dict[str, str] | None = None,
+    date_windows: int = 1,
+    streaming: bool = False,
+    stream_queue_size: int = 32,
+    flush_policy: FlushPolicy | None = None,
+    load_mode: str = "write_pandas",
+    stage: str | None = None,
+    arrow_native: bool = False,
+    checkpoint: LoadCheckpoint | None = None,
+    progress_interval_seconds: float = 30.0,
 ):
     """
     Fetches historical stock data for given tickers using a data fetching strategy and loads it
@@ -111,50 +1255,332 @@ def fetch_and_load_stock_data(
         start_date_str (str): Start date for historical data ('YYYY-MM-DD').
         end_date_str (str): End date for historical data ('YYYY-MM-DD').
         chunk_size (int): Number of rows to write per chunk in write_pandas.
-        fetcher_strategy (DataFetcherStrategy): Strategy for fetching data.
+        fetcher_strategy (DataFetcherStrategy): Strategy for fetching data. Must be thread-safe
+            when max_workers > 1. Tickers are passed to it in groups of its batch_size.
+        max_workers (int): Number of ticker batches fetched concurrently. 1 fetches sequentially
+            in ticker order; larger values use a thread pool and gather results as they complete.
+        start_dates (dict[str, str] | None): Optional per-ticker start dates ('YYYY-MM-DD') that
+            override start_date_str, e.g. from get_incremental_start_dates.
+        date_windows (int): Split each ticker's date range into up to this many windows (of at
+            least MIN_DATE_WINDOW_DAYS each) that are fetched concurrently on max_workers threads
+            and stitched back together. Intended for first loads and backfills; batching by
+            fetcher_strategy.batch_size is not used in this mode.
+        streaming (bool): Hand fetched frames to a StreamingSink instead of accumulating them,
+            so uploads overlap with fetching and memory stays flat as the universe grows.
+        stream_queue_size (int): Maximum number of fetched frames waiting for the sink.
+        flush_policy (FlushPolicy | None): When buffered frames are written to Snowflake, by row
+            count, estimated in-memory bytes or elapsed time. Defaults to FlushPolicy().
+        load_mode (str): "write_pandas"; "copy_into" to stage compressed Parquet files and
+            load each flush with a single COPY INTO; or "merge" to COPY each flush into a
+            transient staging table and upsert it into the target on (TICKER, DATE).
+        stage (str | None): Named stage for "copy_into"/"merge"; defaults to the table's own stage.
+        arrow_native (bool): Convert each fetched history to a pyarrow Table as soon as it
+            arrives and write flushes as Parquet straight from the combined chunked table,
+            skipping the pandas concat and rename copies. Requires "copy_into" or "merge".
+        checkpoint (LoadCheckpoint | None): Skips tickers the checkpoint already holds and marks
+            tickers as completed once the flush containing them is written (or when they have
+            no data), so a retried task resumes where the failed try stopped.
+        progress_interval_seconds (float): Minimum seconds between aggregated fetch progress
+            log lines; a final summary is always logged.
     """
-    all_data = []
-    load_timestamp = now("UTC").to_iso8601_string()
+    if arrow_native and load_mode == "write_pandas":
+        raise ValueError("arrow_native requires load_mode 'copy_into' or 'merge'")
+    flush_policy = flush_policy or FlushPolicy()
+    load_timestamp = now("UTC").format(LOAD_TIMESTAMP_FORMAT)
     log.info(f"Load timestamp: {load_timestamp}")
 
     log.info(
-        f"Fetching data for tickers: {tickers} from {start_date_str} to {end_date_str}"
+        f"Fetching data for {len(tickers)} tickers from {start_date_str} to {end_date_str} "
+        f"with {max_workers} worker(s)"
     )
 
-    for ticker_symbol in tickers:
-        try:
-            hist = fetcher_strategy.fetch_data(ticker_symbol, start_date_str, end_date_str)
-            if hist is None:
+    if checkpoint is not None:
+        tickers = checkpoint.remaining(tickers)
+
+    ticker_start_dates = _resolve_start_dates(tickers, start_date_str, end_date_str, start_dates)
+    if date_windows > 1:
+        results = _iter_windowed_fetch_results(
+            list(ticker_start_dates), fetcher_strategy, ticker_start_dates, end_date_str,
+            max_workers, date_windows,
+        )
+    else:
+        results = _iter_fetch_results(
+            list(ticker_start_dates), fetcher_strategy, ticker_start_dates, end_date_str,
+            max_workers,
+        )
+    if arrow_native:
+        results = _iter_arrow_results(results)
+    results = _iter_with_progress(results, FetchProgress(len(ticker_start_dates), progress_interval_seconds))
+    write_batch = partial(
+        write_snowflake,
+        snowflake_conn_id=snowflake_conn_id,
+        database=database,
+        schema=schema,
+        table_name=table_name,
+        chunk_size=chunk_size,
+        load_mode=load_mode,
+        stage=stage,
+        load_timestamp=load_timestamp,
+    )
+    if checkpoint is not None:
+        results = _iter_checkpointed_results(results, checkpoint)
+        write_batch = _checkpointed_write(write_batch, checkpoint)
+
+    # The connection pool is scoped to the run, so its sessions don't outlive the load
+    try:
+        if streaming:
+            _load_streaming(results, StreamingSink(write_batch, stream_queue_size, flush_policy))
+            return
+
+        buffer = _FlushBuffer(flush_policy)
+        flushed = False
+        for ticker_symbol, hist, error in results:
+            if error is None:
+                if hist is not None:
+                    reason = buffer.add(hist)
+                    if reason is not None:
+                        write_batch(all_data=buffer.drain(reason))
+                        flushed = True
                 continue
 
-            hist["TICKER"] = ticker_symbol
-            hist["LOADTIMESTAMP"] = load_timestamp
-            hist.reset_index(inplace=True)
-            all_data.append(hist)
-            log.info(f"Successfully fetched data for {ticker_symbol}")
+            log.error(f"Failed to fetch data for ticker {ticker_symbol}: {error}")
 
-        except Exception as e:
-            log.error(f"Failed to fetch data for ticker {ticker_symbol}: {e}")
-
-            if all_data:
-                log.info('Storing into Snowflake ...')
-                write_snowflake(all_data=all_data, 
-                                snowflake_conn_id=snowflake_conn_id,
-                                database=database,
-                                schema=schema,
-                                table_name=table_name,
-                                chunk_size=chunk_size
-                                )
-                all_data.clear()
-
-    if not all_data:
+            if isinstance(error, FetchAbortedError):
+                # Keep what was fetched before the abort
+                if buffer.frames:
+                    write_batch(all_data=buffer.drain("abort"))
+                raise AirflowException(f"Aborting run after {ticker_symbol}: {error}")
+
+        if buffer.frames:
+            write_batch(all_data=buffer.drain("final"))
+        elif not flushed:
+            log.warning("No data fetched for any ticker. Skipping Snowflake load.")
+    finally:
+        SnowflakeConnectionFactory.close_all()
+
+
+class FetchProgress:
+    """
+    Aggregates per-ticker fetch outcomes and logs a progress summary at most once every
+    interval_seconds, instead of one log line per ticker.
+    """
+
+    def __init__(self, total: int, interval_seconds: float = 30.0):
+        self.total = total
+        self.interval_seconds = interval_seconds
+        self.fetched = 0
+        self.empty = 0
+        self.failed = 0
+        self.rows = 0
+        self._started = time.monotonic()
+        self._last_logged = self._started
+
+    @property
+    def done(self):
+        return self.fetched + self.empty + self.failed
+
+    def record(self, hist, error):
+        metrics = get_metrics()
+        if error is not None:
+            self.failed += 1
+            metrics.increment("fetch.failures", tags={"error": type(error).__name__})
+        elif hist is None:
+            self.empty += 1
+            metrics.increment("fetch.empty")
+        else:
+            self.fetched += 1
+            self.rows += len(hist)
+            if metrics.enabled:
+                metrics.histogram("fetch.rows", len(hist))
+                metrics.histogram("fetch.bytes", _frame_nbytes(hist))
+        if time.monotonic() - self._last_logged >= self.interval_seconds:
+            self.log_summary()
+
+    def log_summary(self, final=False):
+        now_ts = time.monotonic()
+        self._last_logged = now_ts
+        elapsed = now_ts - self._started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        log.info(
+            f"{'Fetched' if final else 'Progress:'} {self.done}/{self.total} tickers "
+            f"({self.fetched} with data, {self.empty} empty, {self.failed} failed), "
+            f"{self.rows} rows in {elapsed:.1f}s ({rate:.1f} tickers/s)"
+        )
+
+
+def _iter_with_progress(results, progress):
+    try:
+        for ticker_symbol, hist, error in results:
+            progress.record(hist, error)
+            yield ticker_symbol, hist, error
+    finally:
+        progress.log_summary(final=True)
+
+
+def _iter_arrow_results(results):
+    for ticker_symbol, hist, error in results:
+        if hist is not None:
+            try:
+                with get_tracer().span("yfinance.to_arrow", ticker=ticker_symbol, rows=len(hist)):
+                    hist = history_to_arrow(hist)
+            except Exception as e:
+                hist, error = None, e
+        yield ticker_symbol, hist, error
+
+
+def _frame_tickers(frame):
+    if isinstance(frame, pa.Table):
+        return set(frame.column("TICKER").unique().to_pylist())
+    return set(frame["TICKER"].unique())
+
+
+def _iter_checkpointed_results(results, checkpoint):
+    for ticker_symbol, hist, error in results:
+        if hist is None and error is None:
+            # Nothing to load; persisted with the next flush
+            checkpoint.mark_completed([ticker_symbol], persist=False)
+        yield ticker_symbol, hist, error
+
+
+def _checkpointed_write(write_batch, checkpoint):
+    def write(all_data):
+        result = write_batch(all_data=all_data)
+        checkpoint.mark_completed(set().union(*(_frame_tickers(frame) for frame in all_data)))
+        return result
+
+    return write
+
+
+def _load_streaming(results, sink):
+    aborted = None
+    try:
+        for ticker_symbol, hist, error in results:
+            if error is None:
+                if hist is not None:
+                    sink.put(hist)
+                continue
+
+            log.error(f"Failed to fetch data for ticker {ticker_symbol}: {error}")
+            if isinstance(error, FetchAbortedError):
+                aborted = AirflowException(f"Aborting run after {ticker_symbol}: {error}")
+                break
+    finally:
+        # Flush whatever was fetched before an abort or failure
+        sink.close()
+
+    if aborted is not None:
+        raise aborted
+    if sink.batches_written == 0:
         log.warning("No data fetched for any ticker. Skipping Snowflake load.")
-        return
+    else:
+        log.info(f"Streamed {sink.rows_written} rows to Snowflake in {sink.batches_written} micro-batches.")
 
-    write_snowflake(all_data=all_data, 
-                    snowflake_conn_id=snowflake_conn_id,
-                    database=database,
-                    schema=schema,
-                    table_name=table_name,
-                    chunk_size=chunk_size
-                    )
+
+@_traced("fetch_and_load")
+async def async_fetch_and_load_stock_data(
+    tickers: list[str],
+    snowflake_conn_id: str,
+    table_name: str,
+    schema: str,
+    database: str,
+    start_date_str: str,
+    end_date_str: str,
+    chunk_size: int = 10000,
+    fetcher_strategy: AsyncDataFetcherStrategy = None,
+    max_concurrency: int = 100,
+    start_dates: dict[str, str] | None = None,
+    flush_policy: FlushPolicy | None = None,
+    load_mode: str = "write_pandas",
+    stage: str | None = None,
+    progress_interval_seconds: float = 30.0,
+):
+    """
+    Async variant of fetch_and_load_stock_data. All ticker fetches are scheduled on the running
+    event loop and at most max_concurrency of them are in flight at once. Snowflake writes are
+    offloaded to a thread so they do not block in-flight fetches.
+
+    Args:
+        tickers (list[str]): List of stock tickers (e.g., ['MSFT', 'AAPL']).
+        snowflake_conn_id (str): Airflow connection ID for Snowflake.
+        table_name (str): Target table name in Snowflake.
+        schema (str): Target schema name in Snowflake.
+        database (str): Target database name in Snowflake.
+        start_date_str (str): Start date for historical data ('YYYY-MM-DD').
+        end_date_str (str): End date for historical data ('YYYY-MM-DD').
+        chunk_size (int): Number of rows to write per chunk in write_pandas.
+        fetcher_strategy (AsyncDataFetcherStrategy): Async strategy for fetching data.
+            Defaults to an AsyncYahooChartFetcher, which fetches on the event loop itself.
+        max_concurrency (int): Maximum number of fetches awaited concurrently. A thread-backed
+            strategy such as AsyncYahooFinanceFetcher only reaches this if its pool is as large.
+        start_dates (dict[str, str] | None): Optional per-ticker start dates ('YYYY-MM-DD') that
+            override start_date_str.
+        flush_policy (FlushPolicy | None): When buffered frames are written to Snowflake.
+            Defaults to FlushPolicy().
+        load_mode (str): "write_pandas", "copy_into" or "merge", as in fetch_and_load_stock_data.
+        stage (str | None): Named stage for "copy_into"/"merge"; defaults to the table's own stage.
+        progress_interval_seconds (float): Minimum seconds between aggregated fetch progress
+            log lines.
+    """
+    owned_fetcher = None
+    if fetcher_strategy is None:
+        fetcher_strategy = owned_fetcher = AsyncYahooChartFetcher(max_connections=max_concurrency)
+    load_timestamp = now("UTC").format(LOAD_TIMESTAMP_FORMAT)
+    log.info(f"Load timestamp: {load_timestamp}")
+    write_batch = partial(
+        write_snowflake,
+        snowflake_conn_id=snowflake_conn_id,
+        database=database,
+        schema=schema,
+        table_name=table_name,
+        chunk_size=chunk_size,
+        load_mode=load_mode,
+        stage=stage,
+        load_timestamp=load_timestamp,
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+    buffer = _FlushBuffer(flush_policy or FlushPolicy())
+    flushed = False
+
+    log.info(
+        f"Fetching data for {len(tickers)} tickers from {start_date_str} to {end_date_str} "
+        f"with up to {max_concurrency} concurrent request(s)"
+    )
+
+    try:
+        ticker_start_dates = _resolve_start_dates(tickers, start_date_str, end_date_str, start_dates)
+        tasks = [
+            asyncio.ensure_future(_fetch_ticker_async(
+                fetcher_strategy, semaphore, ticker_symbol, ticker_start, end_date_str
+            ))
+            for ticker_symbol, ticker_start in ticker_start_dates.items()
+        ]
+        progress = FetchProgress(len(tasks), progress_interval_seconds)
+        for next_result in asyncio.as_completed(tasks):
+            ticker_symbol, hist, error = await next_result
+            progress.record(hist, error)
+            if error is None:
+                if hist is not None:
+                    reason = buffer.add(hist)
+                    if reason is not None:
+                        await asyncio.to_thread(write_batch, all_data=buffer.drain(reason))
+                        flushed = True
+                continue
+
+            log.error(f"Failed to fetch data for ticker {ticker_symbol}: {error}")
+
+            if isinstance(error, FetchAbortedError):
+                for task in tasks:
+                    task.cancel()
+                if buffer.frames:
+                    await asyncio.to_thread(write_batch, all_data=buffer.drain("abort"))
+                raise AirflowException(f"Aborting run after {ticker_symbol}: {error}")
+
+        progress.log_summary(final=True)
+        if buffer.frames:
+            await asyncio.to_thread(write_batch, all_data=buffer.drain("final"))
+        elif not flushed:
+            log.warning("No data fetched for any ticker. Skipping Snowflake load.")
+    finally:
+        SnowflakeConnectionFactory.close_all()
+        if owned_fetcher is not None:
+            await owned_fetcher.aclose()
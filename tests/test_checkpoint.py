@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from airflow.exceptions import AirflowException
+from src.checkpoint import LoadCheckpoint
+from src.yfinance_loader import DataFetcherStrategy, FlushPolicy, fetch_and_load_stock_data
+
+class TwoRowFetcher(DataFetcherStrategy):
+    def __init__(self, empty=()):
+        self.empty = set(empty)
+        self.calls = []
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.calls.append(ticker_symbol)
+        if ticker_symbol in self.empty:
+            return None
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date")
+        return pd.DataFrame({"Close": [1.0, 2.0]}, index=index)
+
+class TestLoadCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "2025-04-15", "shard_0.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, fetcher, checkpoint, write):
+        with patch("src.yfinance_loader.write_snowflake", side_effect=write):
+            fetch_and_load_stock_data(
+                tickers=["AAPL", "EMPTY", "MSFT", "GOOG"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=fetcher,
+                flush_policy=FlushPolicy(max_rows=2),
+                checkpoint=checkpoint,
+            )
+
+    def test_retry_resumes_after_committed_tickers(self):
+        def failing_write(all_data, **_):
+            if "MSFT" in set(all_data[0]["TICKER"]):
+                raise AirflowException("Snowflake loading error")
+
+        checkpoint = LoadCheckpoint(self.path, "2025-04-15")
+        with self.assertRaises(AirflowException):
+            self._run(TwoRowFetcher(empty={"EMPTY"}), checkpoint, failing_write)
+        checkpoint.save()
+
+        retry_fetcher = TwoRowFetcher()
+        loaded = []
+        retry_checkpoint = LoadCheckpoint(self.path, "2025-04-15")
+        self.assertEqual(retry_checkpoint.completed(), {"AAPL", "EMPTY"})
+        self._run(retry_fetcher, retry_checkpoint, lambda all_data, **_: loaded.extend(all_data))
+
+        self.assertEqual(retry_fetcher.calls, ["MSFT", "GOOG"])
+        self.assertEqual(sorted(t for df in loaded for t in set(df["TICKER"])), ["GOOG", "MSFT"])
+        self.assertEqual(retry_checkpoint.completed(), {"AAPL", "EMPTY", "MSFT", "GOOG"})
+
+    def test_other_logical_date_is_ignored(self):
+        LoadCheckpoint(self.path, "2025-04-14").mark_completed(["AAPL"])
+        self.assertEqual(LoadCheckpoint(self.path, "2025-04-15").completed(), set())
+
+    def test_clear_removes_store(self):
+        checkpoint = LoadCheckpoint(self.path, "2025-04-15")
+        checkpoint.mark_completed(["AAPL"])
+        checkpoint.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(LoadCheckpoint(self.path, "2025-04-15").completed(), set())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DAG_FILE = PROJECT_ROOT / "dags" / "dag_yfinance_load.py"
+
+# Seconds the DAG file may take to parse on top of the Airflow imports it needs anyway
+MAX_PARSE_SECONDS = float(os.environ.get("DAG_PARSE_MAX_SECONDS", "1.0"))
+
+HEAVY_MODULES = [
+    "yfinance",
+    "pandas",
+    "pyarrow",
+    "snowflake.connector.pandas_tools",
+    "src.yfinance_loader",
+]
+
+# Runs in a fresh interpreter so modules imported by other tests don't hide regressions
+PARSE_SCRIPT = """
+import json, runpy, sys, time
+sys.path.insert(0, {root!r})
+import airflow.decorators, airflow.operators.empty, airflow.providers.snowflake.operators.snowflake
+started = time.perf_counter()
+runpy.run_path({dag_file!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+class TestDagParse(unittest.TestCase):
+    def _parse(self):
+        script = PARSE_SCRIPT.format(root=str(PROJECT_ROOT), dag_file=str(DAG_FILE), heavy=HEAVY_MODULES)
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, cwd=PROJECT_ROOT, timeout=120
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def test_parse_does_not_import_heavy_modules(self):
+        self.assertEqual(self._parse()["loaded"], [])
+
+    def test_parse_time_within_budget(self):
+        # Best of three runs to keep the benchmark stable on noisy machines
+        elapsed = min(self._parse()["elapsed"] for _ in range(3))
+        self.assertLess(
+            elapsed, MAX_PARSE_SECONDS, f"Parsing {DAG_FILE.name} took {elapsed:.2f}s (budget {MAX_PARSE_SECONDS}s)"
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import pandas as pd
+from unittest.mock import patch
+from src.fetch_cache import ParquetCacheFetcher, QuarantineFetcher
+from src.yfinance_loader import DataFetcherStrategy, fetch_and_load_stock_data
+
+class RangeFetcher(DataFetcherStrategy):
+    def __init__(self):
+        self.calls = []
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.calls.append((ticker_symbol, start_date_str, end_date_str))
+        index = pd.date_range(start_date_str, end_date_str, freq="D", inclusive="left", tz="America/New_York", name="Date")
+        if len(index) == 0:
+            return None
+        return pd.DataFrame({"Close": range(len(index))}, index=index, dtype="float64")
+
+class BatchRangeFetcher(RangeFetcher):
+    batch_size = 3
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+        self.batches.append((tuple(ticker_symbols), start_date_str, end_date_str))
+        return {t: RangeFetcher.fetch_data(self, t, start_date_str, end_date_str) for t in ticker_symbols}
+
+class TestParquetCacheFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.inner = RangeFetcher()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_repeat_request_served_from_cache(self):
+        fetcher = ParquetCacheFetcher(self.inner, self.tmp.name)
+        first = fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-10")
+        second = fetcher.fetch_data("AAPL", "2025-04-03", "2025-04-10")
+
+        self.assertEqual(len(self.inner.calls), 1)
+        self.assertEqual(len(first), 9)
+        self.assertEqual(len(second), 7)
+
+    def test_only_missing_tail_is_fetched(self):
+        fetcher = ParquetCacheFetcher(self.inner, self.tmp.name)
+        fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-10")
+        hist = fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-15")
+
+        self.assertEqual(self.inner.calls[-1], ("AAPL", "2025-04-10", "2025-04-15"))
+        self.assertEqual(len(hist), 14)
+        self.assertTrue(hist.index.is_unique)
+        self.assertEqual([p.name for p in fetcher.cache_dir.glob("*.parquet")],
+                         ["AAPL__2025-04-01__2025-04-15.parquet"])
+
+    def test_expired_entries_are_refetched(self):
+        fetcher = ParquetCacheFetcher(self.inner, self.tmp.name, ttl_seconds=60)
+        fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-10")
+        for path in fetcher.cache_dir.glob("*.parquet"):
+            old = time.time() - 120
+            os.utime(path, (old, old))
+
+        fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-10")
+        self.assertEqual(len(self.inner.calls), 2)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        fetcher = ParquetCacheFetcher(self.inner, self.tmp.name)
+        fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-10")
+        entry_size = next(fetcher.cache_dir.glob("*.parquet")).stat().st_size
+        fetcher.max_bytes = entry_size * 2
+        for path in fetcher.cache_dir.glob("*.parquet"):
+            os.utime(path, (time.time() - 100, path.stat().st_mtime))
+
+        fetcher.fetch_data("MSFT", "2025-04-01", "2025-04-10")
+        fetcher.fetch_data("GOOG", "2025-04-01", "2025-04-10")
+
+        names = sorted(p.name.split("__")[0] for p in fetcher.cache_dir.glob("*.parquet"))
+        self.assertEqual(names, ["GOOG", "MSFT"])
+
+    def test_batches_misses_and_tails_through_wrapped_strategy(self):
+        inner = BatchRangeFetcher()
+        fetcher = ParquetCacheFetcher(inner, self.tmp.name)
+        self.assertEqual(fetcher.batch_size, 3)
+        fetcher.fetch_batch(["AAPL", "MSFT"], "2025-04-01", "2025-04-10")
+        inner.batches.clear()
+        inner.calls.clear()
+
+        result = fetcher.fetch_batch(["AAPL", "MSFT", "GOOG"], "2025-04-01", "2025-04-15")
+
+        self.assertEqual(inner.batches, [(("AAPL", "MSFT"), "2025-04-10", "2025-04-15")])
+        self.assertIn(("GOOG", "2025-04-01", "2025-04-15"), inner.calls)
+        self.assertEqual({t: len(hist) for t, hist in result.items()}, {"AAPL": 14, "MSFT": 14, "GOOG": 14})
+
+    def test_lookups_and_stores_do_not_scan_other_tickers(self):
+        fetcher = ParquetCacheFetcher(self.inner, self.tmp.name)
+        for ticker in ["A", "AA", "AAPL"]:
+            fetcher.fetch_data(ticker, "2025-04-01", "2025-04-10")
+        with patch.object(ParquetCacheFetcher, "_evict") as mock_evict:
+            hist = fetcher.fetch_data("A", "2025-04-01", "2025-04-15")
+
+        mock_evict.assert_not_called()
+        self.assertEqual(len(hist), 14)
+        self.assertEqual([path.name for path, _, _ in fetcher._entries("A")], ["A__2025-04-01__2025-04-15.parquet"])
+        self.assertEqual(fetcher._total_bytes, sum(p.stat().st_size for p in fetcher.cache_dir.glob("*.parquet")))
+
+class EmptyFetcher(DataFetcherStrategy):
+    def __init__(self, empty=(), failing=()):
+        self.empty = set(empty)
+        self.failing = set(failing)
+        self.calls = []
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.calls.append(ticker_symbol)
+        if ticker_symbol in self.failing:
+            raise KeyError(ticker_symbol)
+        if ticker_symbol in self.empty:
+            return None
+        return pd.DataFrame({"Close": [1.0]})
+
+class ListedFetcher(DataFetcherStrategy):
+    """Daily rows from each ticker's listing date on; tickers without one have no data at all."""
+
+    def __init__(self, listed):
+        self.listed = listed
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        with self._lock:
+            self.calls.append(ticker_symbol)
+        if ticker_symbol not in self.listed:
+            return None
+        start = max(start_date_str, self.listed[ticker_symbol])
+        index = pd.date_range(start, end_date_str, freq="D", inclusive="left", name="Date")
+        return pd.DataFrame({"Close": 1.0}, index=index) if len(index) else None
+
+class TestQuarantineFetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.tmp.name, "quarantine.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_empty_and_failing_tickers_are_skipped_on_next_run(self):
+        inner = EmptyFetcher(empty={"DEAD"}, failing={"BAD"})
+        fetcher = QuarantineFetcher(inner, self.store_path)
+        for ticker in ["AAPL", "DEAD", "BAD"]:
+            try:
+                fetcher.fetch_data(ticker, "2025-04-01", "2025-04-16")
+            except KeyError:
+                pass
+        fetcher.save()
+
+        inner.calls.clear()
+        next_run = QuarantineFetcher(inner, self.store_path)
+        for ticker in ["AAPL", "DEAD", "BAD"]:
+            next_run.fetch_data(ticker, "2025-04-01", "2025-04-16")
+
+        self.assertEqual(inner.calls, ["AAPL"])
+        self.assertEqual(next_run.requests_saved, 2)
+        self.assertEqual(next_run.quarantined_tickers(), ["BAD", "DEAD"])
+
+    def test_cooldown_doubles_and_success_releases(self):
+        inner = EmptyFetcher(empty={"DEAD"})
+        fetcher = QuarantineFetcher(inner, self.store_path, base_cooldown_seconds=100)
+
+        fetcher.fetch_data("DEAD", "2025-04-01", "2025-04-16")
+        first_check = fetcher._entries["DEAD"]["next_check"]
+        fetcher._entries["DEAD"]["next_check"] = 0
+        fetcher.fetch_data("DEAD", "2025-04-01", "2025-04-16")
+        self.assertEqual(fetcher._entries["DEAD"]["failures"], 2)
+        self.assertGreater(fetcher._entries["DEAD"]["next_check"] - first_check, 90)
+
+        inner.empty.clear()
+        fetcher._entries["DEAD"]["next_check"] = 0
+        self.assertIsNotNone(fetcher.fetch_data("DEAD", "2025-04-01", "2025-04-16"))
+        self.assertEqual(fetcher.quarantined_tickers(), [])
+        self.assertEqual(fetcher.released, 1)
+
+    def test_short_empty_ranges_do_not_quarantine(self):
+        fetcher = QuarantineFetcher(EmptyFetcher(empty={"AAPL"}), self.store_path)
+        fetcher.fetch_data("AAPL", "2025-04-12", "2025-04-14")
+        self.assertEqual(fetcher.quarantined_tickers(), [])
+
+    def test_batches_skip_quarantined_tickers_and_judge_the_rest(self):
+        inner = BatchRangeFetcher()
+        fetcher = QuarantineFetcher(inner, self.store_path)
+        fetcher._quarantine("DEAD", "no data")
+        fetcher._quarantine("BACK", "no data")
+        fetcher._entries["BACK"]["next_check"] = 0
+
+        results = fetcher.fetch_batch(["AAPL", "DEAD", "BACK", "MSFT"], "2025-04-01", "2025-04-16")
+
+        self.assertEqual(fetcher.batch_size, 3)
+        self.assertEqual(inner.batches, [(("AAPL", "BACK", "MSFT"), "2025-04-01", "2025-04-16")])
+        self.assertIsNone(results["DEAD"])
+        self.assertEqual(len(results["BACK"]), 15)
+        self.assertEqual(fetcher.requests_saved, 1)
+        self.assertEqual(fetcher.quarantined_tickers(), ["DEAD"])
+        self.assertEqual(fetcher.released, 1)
+
+    def _load_windowed(self, fetcher, tickers, max_workers):
+        loaded = []
+        with patch(
+            "src.yfinance_loader.write_snowflake",
+            side_effect=lambda all_data, **_: loaded.extend(t for df in all_data for t in df["TICKER"]),
+        ):
+            fetch_and_load_stock_data(
+                tickers=tickers,
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2000-01-01",
+                end_date_str="2025-01-01",
+                fetcher_strategy=fetcher,
+                max_workers=max_workers,
+                date_windows=4,
+            )
+        return loaded
+
+    def test_empty_leading_date_window_does_not_quarantine(self):
+        for max_workers in (1, 8):
+            with self.subTest(max_workers=max_workers):
+                listed = {f"T{i}": "2015-06-01" for i in range(20)}
+                inner = ListedFetcher(listed)
+                fetcher = QuarantineFetcher(inner, self.store_path)
+                loaded = self._load_windowed(fetcher, sorted(listed) + ["DEAD"], max_workers)
+
+                self.assertEqual(len(inner.calls), 4 * 21)
+                self.assertEqual(sorted(set(loaded)), sorted(listed))
+                self.assertEqual(loaded.count("T0"), (pd.Timestamp("2025-01-01") - pd.Timestamp("2015-06-01")).days)
+                self.assertEqual(fetcher.quarantined_tickers(), ["DEAD"])
+                self.assertEqual(fetcher._entries["DEAD"]["failures"], 1)
+
+    def test_skipped_windowed_ticker_keeps_its_cooldown(self):
+        inner = ListedFetcher({})
+        fetcher = QuarantineFetcher(inner, self.store_path)
+        self._load_windowed(fetcher, ["DEAD"], 1)
+        next_check = fetcher._entries["DEAD"]["next_check"]
+
+        self._load_windowed(fetcher, ["DEAD"], 1)
+        self.assertEqual(len(inner.calls), 4)
+        self.assertEqual(fetcher.requests_saved, 4)
+        self.assertEqual(fetcher._entries["DEAD"], {"failures": 1, "next_check": next_check, "reason": "empty"})
+
+if __name__ == "__main__":
+    unittest.main()
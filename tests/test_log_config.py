@@ -0,0 +1,55 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from src.log_config import queue_logging
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.getMessage(), threading.current_thread().name))
+
+class TestQueueLogging(unittest.TestCase):
+    def setUp(self):
+        self.root_handler = RecordingHandler()
+        logging.getLogger().addHandler(self.root_handler)
+
+    def tearDown(self):
+        logging.getLogger().removeHandler(self.root_handler)
+
+    def test_records_are_written_off_the_calling_threads(self):
+        logger = logging.getLogger("src.yfinance_loader")
+        package_logger = logging.getLogger("src")
+        handlers_before = package_logger.handlers[:]
+        with tempfile.TemporaryDirectory() as tmp:
+            log_file = os.path.join(tmp, "loader.log")
+            with queue_logging(log_file=log_file):
+                workers = [
+                    threading.Thread(target=logger.info, args=(f"message {i}",), name=f"worker_{i}")
+                    for i in range(4)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+
+            with open(log_file) as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(sorted(m for m, _ in self.root_handler.records), [f"message {i}" for i in range(4)])
+        emitting_threads = {t for _, t in self.root_handler.records}
+        self.assertTrue(emitting_threads.isdisjoint({f"worker_{i}" for i in range(4)}))
+        self.assertEqual(package_logger.handlers, handlers_before)
+        self.assertTrue(package_logger.propagate)
+
+    def test_importing_loader_configures_no_handlers(self):
+        import src.yfinance_loader as loader
+        self.assertEqual(loader.log.handlers, [])
+
+if __name__ == "__main__":
+    unittest.main()
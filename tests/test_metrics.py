@@ -0,0 +1,85 @@
+import socket
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from src.metrics import InMemoryMetrics, NoOpMetrics, StatsdMetrics, get_metrics, set_metrics_backend
+from src.yfinance_loader import DataFetcherStrategy, SnowflakeConnectionFactory, fetch_and_load_stock_data
+
+class FlakyFetcher(DataFetcherStrategy):
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        if ticker_symbol == "BAD":
+            raise KeyError(ticker_symbol)
+        if ticker_symbol == "EMPTY":
+            return None
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15", "2025-04-16"], name="Date")
+        return pd.DataFrame({"Close": [1.0, 2.0, 3.0], "Volume": [1, 2, 3]}, index=index)
+
+class TestInMemoryMetrics(unittest.TestCase):
+    def test_records_and_filters_by_tags(self):
+        metrics = InMemoryMetrics()
+        metrics.increment("fetch.failures", tags={"error": "KeyError"})
+        metrics.increment("fetch.failures", 2, tags={"error": "ValueError"})
+        with metrics.timer("load.duration", {"mode": "merge"}):
+            pass
+        self.assertEqual(metrics.counter("fetch.failures"), 3)
+        self.assertEqual(metrics.counter("fetch.failures", error="ValueError"), 2)
+        self.assertEqual(len(metrics.timing_values("load.duration", mode="merge")), 1)
+        self.assertEqual(metrics.summary()[0][0], "load.duration")
+
+    def test_default_backend_is_noop(self):
+        set_metrics_backend(None)
+        self.assertIsInstance(get_metrics(), NoOpMetrics)
+        self.assertFalse(get_metrics().enabled)
+
+class TestStatsdMetrics(unittest.TestCase):
+    def test_sends_statsd_lines_with_tags(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        try:
+            metrics = StatsdMetrics(port=receiver.getsockname()[1], host="127.0.0.1")
+            metrics.timing("load.duration", 1.5, {"mode": "merge"})
+            metrics.increment("fetch.failures", tags={"error": "KeyError"})
+            lines = [receiver.recv(1024).decode() for _ in range(2)]
+        finally:
+            receiver.close()
+        self.assertEqual(lines, [
+            "yfinance.load.duration:1500.0|ms|#mode:merge",
+            "yfinance.fetch.failures:1|c|#error:KeyError",
+        ])
+
+class TestLoaderMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = InMemoryMetrics()
+        set_metrics_backend(self.metrics)
+
+    def tearDown(self):
+        set_metrics_backend(None)
+        SnowflakeConnectionFactory.close_all()
+
+    @patch("src.yfinance_loader.write_pandas", return_value=(True, 1, 6, None))
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_fetch_and_load_emits_stage_metrics(self, mock_hook, mock_write_pandas):
+        fetch_and_load_stock_data(
+            tickers=["AAPL", "BAD", "EMPTY", "MSFT"],
+            snowflake_conn_id="mock_conn_id",
+            table_name="PRICE_HISTORY",
+            schema="PUBLIC",
+            database="YFINANCE",
+            start_date_str="2025-04-01",
+            end_date_str="2025-04-17",
+            fetcher_strategy=FlakyFetcher(),
+        )
+
+        self.assertEqual(len(self.metrics.timing_values("fetch.latency")), 4)
+        self.assertEqual(self.metrics.histogram_values("fetch.rows"), [3, 3])
+        self.assertTrue(all(b > 0 for b in self.metrics.histogram_values("fetch.bytes")))
+        self.assertEqual(self.metrics.counter("fetch.failures", error="KeyError"), 1)
+        self.assertEqual(self.metrics.counter("fetch.empty"), 1)
+        self.assertEqual(len(self.metrics.timing_values("load.concat")), 1)
+        self.assertEqual(len(self.metrics.timing_values("snowflake.connect")), 1)
+        self.assertEqual(len(self.metrics.timing_values("load.duration", mode="write_pandas")), 1)
+        self.assertEqual(self.metrics.histogram_values("load.rows", mode="write_pandas"), [6])
+
+if __name__ == "__main__":
+    unittest.main()
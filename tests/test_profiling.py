@@ -0,0 +1,64 @@
+import pstats
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import pandas as pd
+from src.profiling import main, profile_run
+from src.yfinance_loader import DataFetcherStrategy
+
+class StaticFetcher(DataFetcherStrategy):
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date")
+        return pd.DataFrame({"Close": [1.0, 2.0], "Volume": [1, 2]}, index=index)
+
+def allocate_in_thread(result):
+    result.append([bytearray(1024) for _ in range(1000)])
+
+class TestProfileRun(unittest.TestCase):
+    def test_writes_stats_and_allocations_including_threads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = []
+            with profile_run(tmp, label="attempt=1.profile", top_n=10) as outputs:
+                worker = threading.Thread(target=allocate_in_thread, args=(result,))
+                worker.start()
+                worker.join()
+
+            self.assertEqual(
+                sorted(path.name for path in Path(tmp).iterdir()),
+                ["attempt=1.profile.alloc.txt", "attempt=1.profile.prof", "attempt=1.profile.pstats.txt"],
+            )
+            functions = {name for _, _, name in pstats.Stats(str(outputs["profile"])).stats}
+            self.assertIn("allocate_in_thread", functions)
+            self.assertIn("by cumulative time", outputs["stats"].read_text())
+            allocations = outputs["allocations"].read_text()
+            self.assertIn("Peak traced memory", allocations)
+            self.assertIn("test_profiling.py", allocations)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_writes_files_when_block_fails(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(RuntimeError):
+                with profile_run(tmp) as outputs:
+                    raise RuntimeError("out of memory")
+            self.assertTrue(outputs["profile"].exists())
+            self.assertTrue(outputs["allocations"].exists())
+
+class TestProfilingCli(unittest.TestCase):
+    @patch("src.yfinance_loader.YahooFinanceFetcher", return_value=StaticFetcher())
+    def test_fetch_only_run(self, mock_fetcher):
+        with tempfile.TemporaryDirectory() as tmp:
+            main([
+                "AAPL", "MSFT", "--start", "2025-04-01", "--end", "2025-04-17",
+                "--output-dir", tmp, "--fetch-only", "--max-workers", "2",
+            ])
+            self.assertTrue((Path(tmp) / "fetch_and_load.pstats.txt").exists())
+
+    def test_load_requires_table(self):
+        with self.assertRaises(SystemExit):
+            main(["AAPL", "--start", "2025-04-01", "--end", "2025-04-17"])
+
+if __name__ == "__main__":
+    unittest.main()
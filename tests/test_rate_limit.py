@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from src.rate_limit import AdaptiveRateLimiter, AsyncRateLimitedFetcher, RateLimitedFetcher, is_throttling_error
+from src.yfinance_loader import AsyncDataFetcherStrategy, DataFetcherStrategy, fetch_and_load_stock_data
+
+class YFRateLimitError(Exception):
+    pass
+
+class ScriptedFetcher(DataFetcherStrategy):
+    def __init__(self, outcome="ok"):
+        self.outcome = outcome
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if self.outcome == "throttled":
+                raise YFRateLimitError("Too Many Requests. Rate limited. Try after a while.")
+            if self.outcome == "empty":
+                return None
+            return pd.DataFrame({"Close": [1.0]})
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+class ListedFetcher(DataFetcherStrategy):
+    """Returns daily rows from listed_date on, so earlier date windows are empty."""
+
+    def __init__(self, listed_date):
+        self.listed_date = listed_date
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        start = max(start_date_str, self.listed_date)
+        index = pd.date_range(start, end_date_str, freq="D", inclusive="left", name="Date")
+        if len(index) == 0:
+            return None
+        return pd.DataFrame({"Close": 1.0}, index=index)
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    def test_throttling_backs_off(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1000, initial_concurrency=8, window_size=4)
+        fetcher = RateLimitedFetcher(ScriptedFetcher("throttled"), limiter)
+        for i in range(4):
+            with self.assertRaises(YFRateLimitError):
+                fetcher.fetch_data(f"T{i}", "2025-04-01", "2025-04-16")
+
+        self.assertEqual(limiter.current_rate, 500)
+        self.assertEqual(limiter.concurrency_limit, 4)
+        self.assertEqual(limiter.stats()["total_throttled"], 4)
+
+    def test_empty_responses_back_off_and_clean_windows_ramp_up(self):
+        limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=1000, initial_concurrency=2, window_size=2)
+        empty = RateLimitedFetcher(ScriptedFetcher("empty"), limiter)
+        ok = RateLimitedFetcher(ScriptedFetcher("ok"), limiter)
+
+        empty.fetch_data("A", "2025-04-01", "2025-04-16")
+        empty.fetch_data("B", "2025-04-01", "2025-04-16")
+        self.assertEqual(limiter.current_rate, 50)
+
+        ok.fetch_data("A", "2025-04-01", "2025-04-16")
+        ok.fetch_data("B", "2025-04-01", "2025-04-16")
+        self.assertEqual(limiter.current_rate, 51)
+        self.assertEqual(limiter.concurrency_limit, 2)
+
+    @patch("src.yfinance_loader.write_snowflake")
+    def test_empty_leading_date_windows_do_not_back_off(self, mock_write):
+        limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=1000, initial_concurrency=4, window_size=4)
+        fetch_and_load_stock_data(
+            tickers=[f"T{i}" for i in range(4)],
+            snowflake_conn_id="mock_conn_id",
+            table_name="PRICE_HISTORY",
+            schema="PUBLIC",
+            database="YFINANCE",
+            start_date_str="2000-01-01",
+            end_date_str="2025-01-01",
+            fetcher_strategy=RateLimitedFetcher(ListedFetcher("2015-06-01"), limiter),
+            max_workers=4,
+            date_windows=4,
+        )
+
+        self.assertEqual(limiter.stats()["total_requests"], 16)
+        self.assertEqual(limiter.stats()["total_empty"], 0)
+        self.assertGreater(limiter.current_rate, 100)
+
+    @patch("src.yfinance_loader.write_snowflake")
+    def test_unsplit_ranges_still_report_empty_responses(self, mock_write):
+        limiter = AdaptiveRateLimiter(initial_rate=100, max_rate=1000, initial_concurrency=4, window_size=4)
+        fetch_and_load_stock_data(
+            tickers=[f"T{i}" for i in range(4)],
+            snowflake_conn_id="mock_conn_id",
+            table_name="PRICE_HISTORY",
+            schema="PUBLIC",
+            database="YFINANCE",
+            start_date_str="2025-01-01",
+            end_date_str="2025-01-02",
+            fetcher_strategy=RateLimitedFetcher(ScriptedFetcher("empty"), limiter),
+            max_workers=4,
+            date_windows=4,
+        )
+
+        self.assertEqual(limiter.stats()["total_requests"], 4)
+        self.assertEqual(limiter.stats()["total_empty"], 4)
+        self.assertLess(limiter.current_rate, 100)
+
+    def test_concurrency_limit_is_enforced_across_threads(self):
+        limiter = AdaptiveRateLimiter(initial_rate=1000, initial_concurrency=2, window_size=1000)
+        inner = ScriptedFetcher("ok")
+        fetcher = RateLimitedFetcher(inner, limiter)
+        threads = [
+            threading.Thread(target=fetcher.fetch_data, args=(f"T{i}", "2025-04-01", "2025-04-16"))
+            for i in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(inner.peak_in_flight, 2)
+        self.assertEqual(limiter.stats()["total_requests"], 10)
+        self.assertEqual(limiter.in_flight, 0)
+
+    def test_token_bucket_paces_requests(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50, burst=1, initial_concurrency=8, window_size=1000)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+            limiter.release()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+
+    def test_batches_larger_than_the_bucket_pay_their_full_cost(self):
+        limiter = AdaptiveRateLimiter(initial_rate=50, burst=5, initial_concurrency=8, window_size=1000)
+        started = time.monotonic()
+        for _ in range(3):
+            limiter.acquire(20)
+            limiter.release(requests=20)
+        # The first batch runs on the 5-token burst plus 15 tokens of debt; each later one waits 20 / 50s
+        self.assertGreaterEqual(time.monotonic() - started, 0.75)
+
+    def test_async_fetcher_shares_limiter(self):
+        class AsyncEmpty(AsyncDataFetcherStrategy):
+            async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+                return None
+
+        limiter = AdaptiveRateLimiter(initial_rate=1000, window_size=1000)
+        fetcher = AsyncRateLimitedFetcher(AsyncEmpty(), limiter)
+
+        async def run():
+            await asyncio.gather(*(fetcher.fetch_data(f"T{i}", "2025-04-01", "2025-04-16") for i in range(5)))
+
+        asyncio.run(run())
+        self.assertEqual(limiter.stats()["total_empty"], 5)
+
+    def test_is_throttling_error(self):
+        self.assertTrue(is_throttling_error(YFRateLimitError("Too Many Requests")))
+        self.assertFalse(is_throttling_error(ValueError("boom")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import pandas as pd
+from unittest.mock import patch
+from airflow.exceptions import AirflowException
+from src.retry import CircuitBreaker, CircuitOpenError, RetryingFetcher
+from src.yfinance_loader import DataFetcherStrategy, fetch_and_load_stock_data
+
+class FlakyFetcher(DataFetcherStrategy):
+    def __init__(self, failures_before_success=0):
+        self.failures_before_success = failures_before_success
+        self.calls = 0
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.calls += 1
+        if self.calls <= self.failures_before_success:
+            raise ConnectionError("upstream unavailable")
+        index = pd.DatetimeIndex(["2025-04-15"], name="Date")
+        return pd.DataFrame({"Close": [1.0]}, index=index)
+
+@patch("src.retry.time.sleep")
+class TestRetryingFetcher(unittest.TestCase):
+    def test_retries_until_success(self, mock_sleep):
+        inner = FlakyFetcher(failures_before_success=2)
+        fetcher = RetryingFetcher(inner, max_attempts=3, base_delay=1.0, jitter=0.0)
+
+        result = fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-16")
+
+        self.assertIsNotNone(result)
+        self.assertEqual(inner.calls, 3)
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1.0, 2.0])
+
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        fetcher = RetryingFetcher(FlakyFetcher(failures_before_success=10), max_attempts=2)
+        with self.assertRaises(ConnectionError):
+            fetcher.fetch_data("AAPL", "2025-04-01", "2025-04-16")
+
+    def test_backoff_is_capped_and_jittered(self, mock_sleep):
+        fetcher = RetryingFetcher(FlakyFetcher(), base_delay=1.0, max_delay=5.0, jitter=0.5)
+        for attempt in range(1, 8):
+            delay = fetcher.backoff_delay(attempt)
+            self.assertLessEqual(delay, 5.0)
+            self.assertGreaterEqual(delay, min(5.0, 2 ** (attempt - 1)) * 0.5)
+
+    def test_open_circuit_aborts_run(self, mock_sleep):
+        breaker = CircuitBreaker(error_rate_threshold=0.5, min_requests=4)
+        inner = FlakyFetcher(failures_before_success=1000)
+        fetcher = RetryingFetcher(inner, max_attempts=2, circuit_breaker=breaker)
+
+        with patch("src.yfinance_loader.write_snowflake"):
+            with self.assertRaises(AirflowException):
+                fetch_and_load_stock_data(
+                    tickers=[f"T{i}" for i in range(50)],
+                    snowflake_conn_id="mock_conn_id",
+                    table_name="PRICE_HISTORY",
+                    schema="PUBLIC",
+                    database="YFINANCE",
+                    start_date_str="2025-04-01",
+                    end_date_str="2025-04-16",
+                    fetcher_strategy=fetcher,
+                )
+
+        self.assertTrue(breaker.is_open)
+        self.assertEqual(inner.calls, 4)
+        with self.assertRaises(CircuitOpenError):
+            breaker.check()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pandas as pd
+from src.tracing import FileSpanExporter, InMemorySpanExporter, NoOpTracer, Tracer, get_tracer, propagate, set_tracer
+from src.yfinance_loader import DataFetcherStrategy, SnowflakeConnectionFactory, fetch_and_load_stock_data
+
+class StaticFetcher(DataFetcherStrategy):
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date")
+        return pd.DataFrame({"Close": [1.0, 2.0], "Volume": [1, 2]}, index=index)
+
+class TestTracer(unittest.TestCase):
+    def test_spans_nest_across_threads(self):
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(exporter)
+        with tracer.span("root") as root:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [executor.submit(propagate(self._child), tracer, i) for i in range(2)]
+                [future.result() for future in futures]
+        children = [span for span in exporter.spans if span.name == "child"]
+        self.assertEqual(len(children), 2)
+        self.assertTrue(all(span.parent_id == root.span_id for span in children))
+        self.assertTrue(all(span.trace_id == root.trace_id for span in children))
+        self.assertEqual(sorted(span.attributes["index"] for span in children), [0, 1])
+
+    @staticmethod
+    def _child(tracer, index):
+        with tracer.span("child", index=index):
+            pass
+
+    def test_records_errors(self):
+        exporter = InMemorySpanExporter()
+        with self.assertRaises(ValueError):
+            with Tracer(exporter).span("failing"):
+                raise ValueError("boom")
+        self.assertEqual(exporter.spans[0].error, "ValueError: boom")
+        self.assertIsNotNone(exporter.spans[0].duration)
+
+    def test_file_exporter_writes_chrome_trace(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "2025-04-17", "shard_0.trace.json")
+            tracer = Tracer(FileSpanExporter(path))
+            with tracer.span("root"):
+                with tracer.span("child", rows=3):
+                    pass
+            tracer.shutdown()
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["child", "root"])
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"]["rows"], 3)
+        self.assertEqual(events[0]["args"]["parent_id"], events[1]["args"]["span_id"])
+
+    def test_default_tracer_is_noop(self):
+        set_tracer(None)
+        self.assertIsInstance(get_tracer(), NoOpTracer)
+        self.assertFalse(get_tracer().enabled)
+
+class TestLoaderTracing(unittest.TestCase):
+    def setUp(self):
+        self.exporter = InMemorySpanExporter()
+        set_tracer(Tracer(self.exporter))
+
+    def tearDown(self):
+        set_tracer(None)
+        SnowflakeConnectionFactory.close_all()
+
+    @patch("src.yfinance_loader.write_pandas", return_value=(True, 1, 4, None))
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_fetch_and_load_records_stage_spans(self, mock_hook, mock_write_pandas):
+        fetch_and_load_stock_data(
+            tickers=["AAPL", "MSFT"],
+            snowflake_conn_id="mock_conn_id",
+            table_name="PRICE_HISTORY",
+            schema="PUBLIC",
+            database="YFINANCE",
+            start_date_str="2025-04-01",
+            end_date_str="2025-04-17",
+            fetcher_strategy=StaticFetcher(),
+            max_workers=2,
+        )
+
+        spans = {}
+        for span in self.exporter.spans:
+            spans.setdefault(span.name, []).append(span)
+        root = spans["fetch_and_load"][0]
+        self.assertEqual(root.attributes["tickers"], 2)
+        self.assertEqual(sorted(span.attributes["tickers"] for span in spans["yfinance.fetch"]), ["AAPL", "MSFT"])
+        self.assertTrue(all(span.parent_id == root.span_id for span in spans["yfinance.fetch"]))
+        transforms = spans["yfinance.transform"]
+        self.assertEqual(sorted(span.attributes["ticker"] for span in transforms), ["AAPL", "MSFT"])
+        self.assertTrue(all(span.attributes["rows"] == 2 and span.attributes["bytes"] > 0 for span in transforms))
+        self.assertEqual(spans["snowflake.concat"][0].attributes["rows"], 4)
+        self.assertEqual(len(spans["snowflake.connect"]), 1)
+        load = spans["snowflake.load"][0]
+        self.assertEqual(spans["snowflake.write_pandas"][0].parent_id, load.span_id)
+        self.assertEqual({span.trace_id for span in self.exporter.spans}, {root.trace_id})
+
+if __name__ == "__main__":
+    unittest.main()
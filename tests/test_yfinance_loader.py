@@ -1,12 +1,82 @@
+import asyncio
+import gc
+import glob
+import os
+import tempfile
+import threading
+import time
 import unittest
+import weakref
+from datetime import datetime
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 from src.yfinance_loader import (
     fetch_and_load_stock_data, 
+    get_incremental_start_dates,
+    get_ticker_watermarks,
+    shard_tickers,
+    async_fetch_and_load_stock_data,
+    AsyncDataFetcherStrategy,
+    AsyncYahooChartFetcher,
+    AsyncYahooFinanceFetcher,
+    DataFetcherStrategy,
     YahooFinanceFetcher, 
-    SnowflakeConnectionFactory
+    YahooFinanceBatchFetcher,
+    _split_date_range,
+    SnowflakeConnectionFactory,
+    StreamingSink,
+    FlushPolicy,
+    copy_into_snowflake,
+    merge_into_snowflake,
+    normalize_frames,
+    history_to_arrow,
+    write_snowflake,
+    create_yahoo_session,
  )
 
+class FakeFetcher(DataFetcherStrategy):
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.calls.append(ticker_symbol)
+        if ticker_symbol in self.failing:
+            raise ValueError(f"boom {ticker_symbol}")
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date")
+        return pd.DataFrame({"Close": [1.0, 2.0], "Volume": [10, 20]}, index=index)
+
+def capture_loads(**kwargs):
+    """Returns a write_snowflake patch that snapshots each flushed batch before it is cleared."""
+    loads = []
+    mock_write = patch(
+        "src.yfinance_loader.write_snowflake",
+        side_effect=lambda all_data, **_: loads.append(list(all_data)),
+        **kwargs,
+    )
+    return mock_write, loads
+
+class FakeAsyncFetcher(AsyncDataFetcherStrategy):
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if ticker_symbol in self.failing:
+                raise ValueError(f"boom {ticker_symbol}")
+            index = pd.DatetimeIndex(["2025-04-15"], name="Date")
+            return pd.DataFrame({"Close": [1.0]}, index=index)
+        finally:
+            self.in_flight -= 1
+
 class TestYahooFinanceFetcher(unittest.TestCase):
     @patch("yfinance.Ticker")
     def test_fetch_data_success(self, mock_ticker):
@@ -31,8 +101,82 @@ class TestYahooFinanceFetcher(unittest.TestCase):
 
         self.assertIsNone(result)
 
+class TestYahooSession(unittest.TestCase):
+    @patch("yfinance.Ticker")
+    @patch("src.yfinance_loader.create_yahoo_session")
+    def test_one_session_shared_across_threads(self, mock_create_session, mock_ticker):
+        mock_ticker.return_value.history.return_value = pd.DataFrame({"Close": [150]})
+        fetcher = YahooFinanceFetcher(pool_size=4)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda t: fetcher.fetch_data(t, "2025-04-01", "2025-04-15"), ["A", "B", "C", "D"]))
+
+        mock_create_session.assert_called_once_with(4)
+        sessions = {call.kwargs["session"] for call in mock_ticker.call_args_list}
+        self.assertEqual(sessions, {mock_create_session.return_value})
+
+    def test_create_yahoo_session_is_keep_alive_session(self):
+        session = create_yahoo_session(pool_size=4)
+        try:
+            self.assertTrue(hasattr(session, "get"))
+        finally:
+            session.close()
+
+class TestYahooFinanceBatchFetcher(unittest.TestCase):
+    @patch("yfinance.download")
+    def test_fetch_batch_splits_per_ticker(self, mock_download):
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date")
+        columns = pd.MultiIndex.from_product(
+            [["AAPL", "MSFT", "DEAD"], ["Close", "Volume"]], names=["Ticker", "Price"]
+        )
+        mock_download.return_value = pd.DataFrame(
+            [[150.0, 100.0, float("nan"), float("nan"), float("nan"), float("nan")],
+             [151.0, 110.0, 390.0, 200.0, float("nan"), float("nan")]],
+            index=index,
+            columns=columns,
+        )
+
+        fetcher = YahooFinanceBatchFetcher(batch_size=3)
+        result = fetcher.fetch_batch(["AAPL", "MSFT", "DEAD"], "2025-04-01", "2025-04-16")
+
+        mock_download.assert_called_once()
+        self.assertIs(mock_download.call_args.kwargs["session"], fetcher.session)
+        self.assertEqual(list(result["AAPL"].columns), ["Close", "Volume"])
+        self.assertEqual(len(result["AAPL"]), 2)
+        self.assertEqual(len(result["MSFT"]), 1)
+        self.assertEqual(result["MSFT"]["Volume"].dtype, "int64")
+        self.assertIsNone(result["DEAD"])
+
+    def test_fetch_and_load_groups_tickers_into_batches(self):
+        class RecordingBatchFetcher(FakeFetcher):
+            batch_size = 2
+
+            def fetch_batch(self, ticker_symbols, start_date_str, end_date_str):
+                self.calls.append(tuple(ticker_symbols))
+                return {t: FakeFetcher.fetch_data(self, t, start_date_str, end_date_str) for t in ticker_symbols}
+
+        fetcher = RecordingBatchFetcher()
+        with patch("src.yfinance_loader.write_snowflake") as mock_write:
+            fetch_and_load_stock_data(
+                tickers=["A", "B", "C", "D"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=fetcher,
+            )
+        self.assertIn(("A", "B"), fetcher.calls)
+        self.assertIn(("C", "D"), fetcher.calls)
+        loaded = pd.concat(mock_write.call_args.kwargs["all_data"])
+        self.assertEqual(sorted(loaded["TICKER"].unique()), ["A", "B", "C", "D"])
+
 class TestSnowflakeConnectionFactory(unittest.TestCase):
-    @patch("airflow.providers.snowflake.hooks.snowflake.SnowflakeHook")
+    def tearDown(self):
+        SnowflakeConnectionFactory.close_all()
+
+    @patch("src.yfinance_loader.SnowflakeHook")
     def test_create_connection(self, mock_hook):
         mock_conn = MagicMock()
         mock_hook.return_value.get_conn.return_value = mock_conn
@@ -40,5 +184,690 @@ class TestSnowflakeConnectionFactory(unittest.TestCase):
         conn = SnowflakeConnectionFactory.create_connection("mock_conn_id")
         self.assertEqual(conn, mock_conn)
 
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_pooled_connection_is_reused_across_flushes(self, mock_hook):
+        mock_conn = MagicMock()
+        mock_conn.is_closed.return_value = False
+        mock_hook.return_value.get_conn.return_value = mock_conn
+        opened_before = SnowflakeConnectionFactory.stats()["connections_opened"]
+
+        for _ in range(3):
+            with SnowflakeConnectionFactory.connection("mock_conn_id") as conn:
+                self.assertIs(conn, mock_conn)
+
+        self.assertEqual(mock_hook.call_count, 1)
+        self.assertEqual(SnowflakeConnectionFactory.stats()["connections_opened"] - opened_before, 1)
+        mock_conn.close.assert_not_called()
+        SnowflakeConnectionFactory.close_all()
+        mock_conn.close.assert_called_once()
+
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_unhealthy_connection_is_replaced(self, mock_hook):
+        stale, fresh = MagicMock(), MagicMock()
+        stale.is_closed.return_value = False
+        stale.cursor.return_value.execute.side_effect = RuntimeError("session expired")
+        fresh.is_closed.return_value = False
+        mock_hook.return_value.get_conn.side_effect = [stale, fresh]
+
+        with patch.object(SnowflakeConnectionFactory, "health_check_after_seconds", -1):
+            with SnowflakeConnectionFactory.connection("mock_conn_id"):
+                pass
+            with SnowflakeConnectionFactory.connection("mock_conn_id") as conn:
+                self.assertIs(conn, fresh)
+        stale.close.assert_called_once()
+
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_connection_closed_when_block_fails(self, mock_hook):
+        mock_conn = MagicMock()
+        mock_hook.return_value.get_conn.return_value = mock_conn
+        with self.assertRaises(ValueError):
+            with SnowflakeConnectionFactory.connection("mock_conn_id"):
+                raise ValueError("load failed")
+        mock_conn.close.assert_called_once()
+        self.assertEqual(SnowflakeConnectionFactory.stats()["idle_connections"], 0)
+
+    @patch("src.yfinance_loader.write_pandas", return_value=(True, 1, 2, None))
+    @patch("src.yfinance_loader.SnowflakeHook")
+    def test_load_runs_close_their_pooled_connections(self, mock_hook, mock_write_pandas):
+        mock_conn = MagicMock()
+        mock_conn.is_closed.return_value = False
+        mock_hook.return_value.get_conn.return_value = mock_conn
+        load_args = dict(
+            tickers=["AAPL", "MSFT"],
+            snowflake_conn_id="mock_conn_id",
+            table_name="PRICE_HISTORY",
+            schema="PUBLIC",
+            database="YFINANCE",
+            start_date_str="2025-04-01",
+            end_date_str="2025-04-16",
+            flush_policy=FlushPolicy(max_rows=2, max_bytes=None, max_seconds=None),
+        )
+
+        fetch_and_load_stock_data(fetcher_strategy=FakeFetcher(), **load_args)
+        self.assertEqual(mock_write_pandas.call_count, 2)
+        self.assertEqual(mock_hook.call_count, 1)
+        mock_conn.close.assert_called_once()
+        self.assertEqual(SnowflakeConnectionFactory.stats()["idle_connections"], 0)
+
+        asyncio.run(async_fetch_and_load_stock_data(fetcher_strategy=FakeAsyncFetcher(), **load_args))
+        self.assertEqual(mock_conn.close.call_count, 2)
+        self.assertEqual(SnowflakeConnectionFactory.stats()["idle_connections"], 0)
+
+class TestFetchAndLoadStockData(unittest.TestCase):
+    def _run(self, fetcher, tickers, **kwargs):
+        mock_write, loads = capture_loads()
+        with mock_write:
+            fetch_and_load_stock_data(
+                tickers=tickers,
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=fetcher,
+                **kwargs,
+            )
+        return [sorted(set(t for df in batch for t in df["TICKER"])) for batch in loads]
+
+    def test_sequential_loads_all_tickers(self):
+        loads = self._run(FakeFetcher(), ["AAPL", "MSFT"])
+        self.assertEqual(loads, [["AAPL", "MSFT"]])
+
+    def test_thread_pool_loads_all_tickers(self):
+        tickers = [f"T{i}" for i in range(20)]
+        fetcher = FakeFetcher()
+        loads = self._run(fetcher, tickers, max_workers=4)
+        self.assertEqual(sorted(fetcher.calls), sorted(tickers))
+        self.assertEqual(loads, [sorted(tickers)])
+
+    def test_thread_pool_isolates_failures(self):
+        tickers = ["AAPL", "BAD", "MSFT"]
+        loads = self._run(FakeFetcher(failing={"BAD"}), tickers, max_workers=3)
+        loaded = sorted(t for batch in loads for t in batch)
+        self.assertEqual(loaded, ["AAPL", "MSFT"])
+
+    def test_fetched_frames_carry_no_per_row_load_timestamp(self):
+        mock_write = patch("src.yfinance_loader.write_snowflake")
+        with mock_write as write:
+            fetch_and_load_stock_data(
+                tickers=["AAPL"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=FakeFetcher(),
+            )
+        (frame,) = write.call_args.kwargs["all_data"]
+        self.assertNotIn("LOADTIMESTAMP", frame.columns)
+        self.assertRegex(write.call_args.kwargs["load_timestamp"], r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{6}$")
+
+    def test_progress_is_logged_in_aggregate(self):
+        tickers = [f"T{i}" for i in range(5)]
+        with self.assertLogs("src.yfinance_loader", level="INFO") as logs:
+            self._run(FakeFetcher(failing={"T1"}), tickers, progress_interval_seconds=3600)
+        self.assertFalse(any("Successfully fetched" in line for line in logs.output))
+        summaries = [line for line in logs.output if "tickers (" in line]
+        self.assertEqual(len(summaries), 1)
+        self.assertIn("Fetched 5/5 tickers (4 with data, 0 empty, 1 failed), 8 rows", summaries[0])
+
+    def test_failures_do_not_force_flushes(self):
+        tickers = ["AAPL", "BAD1", "MSFT", "BAD2", "GOOG"]
+        loads = self._run(FakeFetcher(failing={"BAD1", "BAD2"}), tickers)
+        self.assertEqual(loads, [["AAPL", "GOOG", "MSFT"]])
+
+    def test_flushes_on_row_limit(self):
+        tickers = [f"T{i}" for i in range(5)]
+        loads = self._run(FakeFetcher(), tickers, flush_policy=FlushPolicy(max_rows=4))
+        self.assertEqual(loads, [["T0", "T1"], ["T2", "T3"], ["T4"]])
+
+class TestFlushPolicy(unittest.TestCase):
+    def test_trigger_reasons(self):
+        policy = FlushPolicy(max_rows=100, max_bytes=1000, max_seconds=60)
+        self.assertIsNone(policy.trigger(99, 999, 59))
+        self.assertEqual(policy.trigger(100, 0, 0), "rows")
+        self.assertEqual(policy.trigger(0, 1000, 0), "bytes")
+        self.assertEqual(policy.trigger(0, 0, 60), "elapsed")
+        self.assertIsNone(FlushPolicy(None, None, None).trigger(10 ** 9, 10 ** 12, 10 ** 6))
+
+    def test_sink_flushes_on_elapsed_time_without_new_frames(self):
+        flushed = threading.Event()
+        sink = StreamingSink(
+            lambda all_data: flushed.set(),
+            flush_policy=FlushPolicy(max_rows=None, max_bytes=None, max_seconds=0.05),
+        )
+        sink.put(pd.DataFrame({"Close": [1.0]}))
+        self.assertTrue(flushed.wait(timeout=2))
+        sink.close()
+        self.assertEqual(sink.batches_written, 1)
+
+class TestAsyncFetchAndLoadStockData(unittest.TestCase):
+    def _run(self, fetcher, tickers, **kwargs):
+        mock_write, loads = capture_loads()
+        with mock_write:
+            asyncio.run(async_fetch_and_load_stock_data(
+                tickers=tickers,
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=fetcher,
+                **kwargs,
+            ))
+        return sorted(
+            t for batch in loads for df in batch for t in df["TICKER"]
+        )
+
+    def test_semaphore_caps_concurrency(self):
+        fetcher = FakeAsyncFetcher()
+        tickers = [f"T{i}" for i in range(50)]
+        loaded = self._run(fetcher, tickers, max_concurrency=5)
+        self.assertEqual(loaded, sorted(tickers))
+        self.assertLessEqual(fetcher.peak_in_flight, 5)
+
+    def test_failures_are_isolated(self):
+        loaded = self._run(FakeAsyncFetcher(failing={"BAD"}), ["AAPL", "BAD", "MSFT"])
+        self.assertEqual(loaded, ["AAPL", "MSFT"])
+
+    def test_yahoo_adapter_wraps_sync_strategy(self):
+        loaded = self._run(AsyncYahooFinanceFetcher(FakeFetcher()), ["AAPL"])
+        self.assertEqual(loaded, ["AAPL", "AAPL"])
+
+    def test_yahoo_adapter_runs_max_workers_fetches_at_once(self):
+        # More than the default executor's min(32, cpu_count + 4) threads
+        workers = 40
+        barrier = threading.Barrier(workers, timeout=10)
+
+        class BarrierFetcher(FakeFetcher):
+            def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+                barrier.wait()
+                return super().fetch_data(ticker_symbol, start_date_str, end_date_str)
+
+        fetcher = AsyncYahooFinanceFetcher(BarrierFetcher(), max_workers=workers)
+        try:
+            tickers = [f"T{i}" for i in range(workers)]
+            loaded = self._run(fetcher, tickers, max_concurrency=workers)
+        finally:
+            fetcher.close()
+        self.assertEqual(sorted(set(loaded)), sorted(tickers))
+
+def chart_payload(timestamps, closes, adjcloses, dividends=None):
+    return {"chart": {"error": None, "result": [{
+        "meta": {"exchangeTimezoneName": "America/New_York"},
+        "timestamp": timestamps,
+        "events": {"dividends": dividends or {}},
+        "indicators": {
+            "quote": [{
+                "open": closes, "high": closes, "low": closes, "close": closes,
+                "volume": [100] * len(closes),
+            }],
+            "adjclose": [{"adjclose": adjcloses}],
+        },
+    }]}}
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class FakeAsyncSession:
+    def __init__(self, responses):
+        self.responses = responses
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def get(self, url, params=None, timeout=None):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            return self.responses[url.rsplit("/", 1)[-1]]
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        pass
+
+class TestAsyncYahooChartFetcher(unittest.TestCase):
+    # 2025-04-14 and 2025-04-15, 09:30 New York time
+    TIMESTAMPS = [1744637400, 1744723800]
+
+    def test_chart_response_is_shaped_like_ticker_history(self):
+        payload = chart_payload(
+            self.TIMESTAMPS, [10.0, 20.0], [5.0, 20.0], dividends={"1744723800": {"amount": 0.25, "date": 1744723800}}
+        )
+        session = FakeAsyncSession({"AAPL": FakeResponse(200, payload), "NOPE": FakeResponse(404)})
+        fetcher = AsyncYahooChartFetcher(session=session)
+
+        hist = asyncio.run(fetcher.fetch_data("AAPL", "2025-04-14", "2025-04-16"))
+        missing = asyncio.run(fetcher.fetch_data("NOPE", "2025-04-14", "2025-04-16"))
+
+        self.assertIsNone(missing)
+        self.assertEqual(list(hist.columns), ["Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"])
+        self.assertEqual(list(hist.index.strftime("%Y-%m-%d")), ["2025-04-14", "2025-04-15"])
+        self.assertEqual(str(hist.index.tz), "America/New_York")
+        self.assertEqual(list(hist["Open"]), [5.0, 20.0])  # Adjusted by adjclose / close
+        self.assertEqual(list(hist["Dividends"]), [0.0, 0.25])
+        self.assertEqual(hist["Volume"].dtype, "int64")
+
+    def test_throttling_raises_recognisable_error(self):
+        from src.rate_limit import is_throttling_error
+
+        fetcher = AsyncYahooChartFetcher(session=FakeAsyncSession({"AAPL": FakeResponse(429)}))
+        with self.assertRaises(Exception) as raised:
+            asyncio.run(fetcher.fetch_data("AAPL", "2025-04-14", "2025-04-16"))
+        self.assertTrue(is_throttling_error(raised.exception))
+
+    @patch("src.yfinance_loader.write_snowflake")
+    def test_async_load_fetches_on_the_loop_by_default(self, mock_write):
+        tickers = [f"T{i}" for i in range(50)]
+        payload = chart_payload(self.TIMESTAMPS, [1.0, 2.0], [1.0, 2.0])
+        session = FakeAsyncSession({t: FakeResponse(200, payload) for t in tickers})
+        threads_before = threading.active_count()
+
+        with patch("src.yfinance_loader.AsyncYahooChartFetcher", return_value=AsyncYahooChartFetcher(session=session)):
+            asyncio.run(async_fetch_and_load_stock_data(
+                tickers=tickers,
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                max_concurrency=20,
+            ))
+
+        self.assertEqual(session.peak_in_flight, 20)
+        self.assertEqual(len(mock_write.call_args.kwargs["all_data"]), 50)
+        # Only the to_thread worker used for the Snowflake write, no fetch pool
+        self.assertLessEqual(threading.active_count() - threads_before, 1)
+
+class TestIncrementalLoad(unittest.TestCase):
+    @patch("src.yfinance_loader.SnowflakeConnectionFactory.create_connection")
+    def test_get_ticker_watermarks_single_query(self, mock_create):
+        cursor = mock_create.return_value.cursor.return_value
+        cursor.fetchall.return_value = [("AAPL", datetime(2025, 4, 14)), ("MSFT", None)]
+
+        watermarks = get_ticker_watermarks("mock_conn_id", "yfinance", "public", "price_history")
+
+        cursor.execute.assert_called_once()
+        self.assertIn("GROUP BY TICKER", cursor.execute.call_args.args[0])
+        self.assertEqual(watermarks, {"AAPL": datetime(2025, 4, 14)})
+        SnowflakeConnectionFactory.close_all()
+        mock_create.return_value.close.assert_called_once()
+
+    def test_start_dates_fall_back_to_backfill(self):
+        start_dates = get_incremental_start_dates(
+            ["AAPL", "NEW"], {"AAPL": datetime(2025, 4, 14)}, "2000-04-15"
+        )
+        self.assertEqual(start_dates, {"AAPL": "2025-04-15", "NEW": "2000-04-15"})
+
+    def test_up_to_date_tickers_are_skipped(self):
+        fetcher = FakeFetcher()
+        with patch("src.yfinance_loader.write_snowflake"):
+            fetch_and_load_stock_data(
+                tickers=["AAPL", "NEW"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2000-04-15",
+                end_date_str="2025-04-15",
+                fetcher_strategy=fetcher,
+                start_dates={"AAPL": "2025-04-15", "NEW": "2000-04-15"},
+            )
+        self.assertEqual(fetcher.calls, ["NEW"])
+
+class TestShardTickers(unittest.TestCase):
+    def test_shards_cover_universe_without_overlap(self):
+        tickers = [f"T{i}" for i in range(200)]
+        shards = shard_tickers(tickers, 8)
+        self.assertEqual(len(shards), 8)
+        self.assertEqual(sorted(t for shard in shards for t in shard), sorted(tickers))
+
+    def test_ticker_stays_in_same_shard_when_universe_changes(self):
+        before = shard_tickers(["AAPL", "MSFT", "GOOG"], 4)
+        after = shard_tickers(["AAPL", "MSFT", "GOOG", "NEW1", "NEW2"], 4)
+        for index, shard in enumerate(before):
+            for ticker in shard:
+                self.assertIn(ticker, after[index])
+
+class TestDateWindows(unittest.TestCase):
+    def test_split_date_range_is_contiguous(self):
+        windows = _split_date_range("2000-01-01", "2025-01-01", 5)
+        self.assertEqual(len(windows), 5)
+        self.assertEqual(windows[0][0], "2000-01-01")
+        self.assertEqual(windows[-1][1], "2025-01-01")
+        for (_, end), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+
+    def test_short_ranges_are_not_split(self):
+        self.assertEqual(_split_date_range("2025-04-01", "2025-04-16", 5), [("2025-04-01", "2025-04-16")])
+
+    def test_windows_are_stitched_without_boundary_duplicates(self):
+        class OverlappingRangeFetcher(DataFetcherStrategy):
+            def __init__(self):
+                self.calls = []
+
+            def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+                self.calls.append((start_date_str, end_date_str))
+                # Include the end date to simulate a duplicated boundary row
+                index = pd.date_range(start_date_str, end_date_str, freq="D", name="Date")
+                return pd.DataFrame({"Close": [float(d.toordinal()) for d in index]}, index=index)
+
+        fetcher = OverlappingRangeFetcher()
+        mock_write, loads = capture_loads()
+        with mock_write:
+            fetch_and_load_stock_data(
+                tickers=["AAPL", "MSFT"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2020-01-01",
+                end_date_str="2024-01-01",
+                fetcher_strategy=fetcher,
+                max_workers=4,
+                date_windows=4,
+            )
+
+        self.assertEqual(len(fetcher.calls), 8)
+        frames = {df["TICKER"].iloc[0]: df for df in loads[0]}
+        self.assertEqual(len(frames), 2)
+        for df in frames.values():
+            self.assertTrue(df["Date"].is_unique)
+            self.assertTrue(df["Date"].is_monotonic_increasing)
+            self.assertEqual(len(df), (datetime(2024, 1, 1) - datetime(2020, 1, 1)).days + 1)
+
+class TestStreamingLoad(unittest.TestCase):
+    def test_streaming_writes_fixed_size_micro_batches(self):
+        tickers = [f"T{i}" for i in range(10)]
+        mock_write, loads = capture_loads()
+        with mock_write:
+            fetch_and_load_stock_data(
+                tickers=tickers,
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=FakeFetcher(failing={"T3"}),
+                max_workers=3,
+                streaming=True,
+                stream_queue_size=2,
+                flush_policy=FlushPolicy(max_rows=4, max_bytes=None, max_seconds=None),
+            )
+
+        # 9 tickers x 2 rows, flushed every 4 rows, plus the remainder on close
+        self.assertEqual([sum(len(df) for df in batch) for batch in loads], [4, 4, 4, 4, 2])
+        loaded = sorted({t for batch in loads for df in batch for t in df["TICKER"]})
+        self.assertEqual(loaded, sorted(set(tickers) - {"T3"}))
+
+    def test_fetches_do_not_run_ahead_of_a_slow_sink(self):
+        fetched = []
+
+        class ProbedFetcher(FakeFetcher):
+            def fetch_data(self, ticker_symbol, start_date_str, end_date_str):
+                hist = super().fetch_data(ticker_symbol, start_date_str, end_date_str)
+                fetched.append(weakref.ref(hist))
+                return hist
+
+        alive = []
+
+        def slow_write(all_data, **_):
+            if not alive:
+                time.sleep(0.5)  # Give the fetch threads time to run ahead
+                gc.collect()
+                alive.append(sum(ref() is not None for ref in fetched))
+
+        with patch("src.yfinance_loader.write_snowflake", side_effect=slow_write):
+            fetch_and_load_stock_data(
+                tickers=[f"T{i}" for i in range(40)],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=ProbedFetcher(),
+                max_workers=4,
+                streaming=True,
+                stream_queue_size=2,
+                flush_policy=FlushPolicy(max_rows=2, max_bytes=None, max_seconds=None),
+            )
+
+        self.assertEqual(len(fetched), 40)
+        # Pending fetches (2 x max_workers), the sink queue and the frames being handed over
+        self.assertLessEqual(alive[0], 2 * 4 + 2 + 3)
+
+    def test_sink_applies_backpressure_and_surfaces_write_errors(self):
+        release = threading.Event()
+
+        def slow_failing_write(all_data):
+            release.wait()
+            raise RuntimeError("snowflake down")
+
+        sink = StreamingSink(slow_failing_write, max_queue_size=1, flush_policy=FlushPolicy(max_rows=1))
+        frame = pd.DataFrame({"Close": [1.0]})
+        sink.put(frame)  # Taken by the sink thread, which blocks in write
+        sink.put(frame)  # Fills the queue
+        blocked = threading.Thread(target=sink.put, args=(frame,))
+        blocked.start()
+        blocked.join(timeout=0.1)
+        self.assertTrue(blocked.is_alive())
+
+        release.set()
+        blocked.join()
+        with self.assertRaises(RuntimeError):
+            sink.close()
+
+class TestCopyIntoLoad(unittest.TestCase):
+    def _frame(self, rows):
+        return pd.DataFrame({
+            "DATE": pd.date_range("2000-01-01", periods=rows, freq="D", tz="America/New_York"),
+            "CLOSE": [float(i) for i in range(rows)],
+            "VOLUME": list(range(rows)),
+            "TICKER": ["AAPL"] * rows,
+        })
+
+    def test_spools_parquet_puts_and_copies_once(self):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        staged = []
+
+        def execute(sql):
+            if sql.startswith("PUT"):
+                spool = sql.split("'file://")[1].split("/*.parquet'")[0]
+                staged.extend(os.path.getsize(p) for p in glob.glob(f"{spool}/*.parquet"))
+
+        cursor.execute.side_effect = execute
+        cursor.fetchall.return_value = [("f1", "LOADED", 600, 600), ("f2", "LOADED", 400, 400)]
+
+        with tempfile.TemporaryDirectory() as spool_dir:
+            report = copy_into_snowflake(
+                conn, self._frame(5000), "yfinance", "public", "price_history",
+                spool_dir=spool_dir, target_file_bytes=16 * 1024,
+            )
+            self.assertEqual(os.listdir(spool_dir), [])
+
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        self.assertEqual(len(statements), 2)
+        self.assertIn("@YFINANCE.PUBLIC.%PRICE_HISTORY/yfinance_", statements[0])
+        self.assertIn("PARALLEL=", statements[0])
+        self.assertTrue(statements[1].startswith("COPY INTO YFINANCE.PUBLIC.PRICE_HISTORY FROM @YFINANCE.PUBLIC.%PRICE_HISTORY/yfinance_"))
+        self.assertGreater(len(staged), 1)
+        self.assertEqual(report, {"files": len(staged), "bytes": sum(staged), "rows": 1000})
+
+    def test_named_stage(self):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchall.return_value = []
+        copy_into_snowflake(conn, self._frame(10), "yfinance", "public", "price_history", stage="YFINANCE.PUBLIC.LOAD_STAGE")
+        put_sql = conn.cursor.return_value.execute.call_args_list[0].args[0]
+        self.assertIn("@YFINANCE.PUBLIC.LOAD_STAGE/yfinance_", put_sql)
+
+    def test_load_timestamp_is_a_server_side_constant(self):
+        conn = MagicMock()
+        conn.cursor.return_value.fetchall.return_value = []
+        copy_into_snowflake(
+            conn, self._frame(10), "yfinance", "public", "price_history", load_timestamp="2025-04-15 00:00:00.000000"
+        )
+        copy_sql = conn.cursor.return_value.execute.call_args_list[1].args[0]
+        self.assertTrue(copy_sql.startswith(
+            "COPY INTO YFINANCE.PUBLIC.PRICE_HISTORY (DATE, CLOSE, VOLUME, TICKER, LOADTIMESTAMP) FROM ("
+            'SELECT $1:"DATE", $1:"CLOSE", $1:"VOLUME", $1:"TICKER", '
+            "'2025-04-15 00:00:00.000000'::TIMESTAMP_NTZ FROM @YFINANCE.PUBLIC.%PRICE_HISTORY/yfinance_"
+        ))
+        self.assertNotIn("MATCH_BY_COLUMN_NAME", copy_sql)
+
+    @patch("src.yfinance_loader.copy_into_snowflake")
+    @patch("src.yfinance_loader.SnowflakeConnectionFactory.create_connection")
+    def test_write_snowflake_copy_into_mode(self, mock_create, mock_copy):
+        mock_copy.return_value = {"files": 1, "bytes": 10, "rows": 1}
+        report = write_snowflake(
+            [self._frame(1)], "mock_conn_id", "yfinance", "public", "price_history", 10000, load_mode="copy_into"
+        )
+        self.assertEqual(report["rows"], 1)
+        SnowflakeConnectionFactory.close_all()
+        mock_create.return_value.close.assert_called_once()
+
+class TestNormalizeFrames(unittest.TestCase):
+    def _frame(self, ticker, tz, volume):
+        index = pd.DatetimeIndex(["2025-04-14", "2025-04-15"], name="Date").tz_localize(tz)
+        frame = pd.DataFrame(
+            {"Close": [1.123456789, 2.0], "Volume": volume, "Stock Splits": [0.0, 0.0]}, index=index
+        )
+        frame["TICKER"] = ticker
+        return frame.reset_index()
+
+    def test_compacts_dtypes_and_keeps_prices(self):
+        frames = [
+            self._frame("AAPL", "America/New_York", [10, 20]),
+            self._frame("SAP.DE", "Europe/Berlin", [30, 40]),
+        ]
+        with self.assertLogs("src.yfinance_loader", level="INFO") as logs:
+            df = normalize_frames(frames)
+
+        self.assertEqual(list(df.columns), ["DATE", "CLOSE", "VOLUME", "STOCK_SPLITS", "TICKER"])
+        self.assertTrue(pd.api.types.is_datetime64_dtype(df["DATE"]))
+        self.assertIsNone(df["DATE"].dt.tz)
+        self.assertEqual(df["DATE"].iloc[0], pd.Timestamp("2025-04-14 04:00"))
+        self.assertEqual(df["DATE"].iloc[2], pd.Timestamp("2025-04-13 22:00"))
+        self.assertEqual(df["VOLUME"].dtype, "int8")
+        self.assertEqual(df["CLOSE"].dtype, "float64")
+        self.assertEqual(df["CLOSE"].iloc[0], 1.123456789)
+        self.assertIsInstance(df["TICKER"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["TICKER"]), ["AAPL", "AAPL", "SAP.DE", "SAP.DE"])
+        self.assertIn("bytes saved", logs.output[-1])
+
+    def test_large_volumes_are_not_truncated(self):
+        df = normalize_frames([
+            self._frame("AAPL", "UTC", [10, 20]),
+            self._frame("TSLA", "UTC", [5_000_000_000, 1]),
+        ])
+        self.assertEqual(df["VOLUME"].dtype, "int64")
+        self.assertEqual(df["VOLUME"].iloc[2], 5_000_000_000)
+
+class TestArrowNativeLoad(unittest.TestCase):
+    @patch("src.yfinance_loader.SnowflakeConnectionFactory.create_connection")
+    def test_copy_into_from_arrow_tables(self, mock_create):
+        cursor = mock_create.return_value.cursor.return_value
+        staged = []
+
+        def execute(sql):
+            if sql.startswith("PUT"):
+                spool = sql.split("'file://")[1].split("/*.parquet'")[0]
+                staged.extend(pq.read_table(p) for p in sorted(glob.glob(f"{spool}/*.parquet")))
+
+        cursor.execute.side_effect = execute
+        cursor.fetchall.return_value = []
+        with patch("src.yfinance_loader.normalize_frames") as mock_normalize:
+            fetch_and_load_stock_data(
+                tickers=["AAPL", "BAD", "MSFT"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=FakeFetcher(failing={"BAD"}),
+                load_mode="copy_into",
+                arrow_native=True,
+            )
+        SnowflakeConnectionFactory.close_all()
+
+        mock_normalize.assert_not_called()
+        table = pa.concat_tables(staged)
+        self.assertEqual(table.column_names, ["DATE", "CLOSE", "VOLUME", "TICKER"])
+        self.assertEqual(table.column("TICKER").to_pylist(), ["AAPL", "AAPL", "MSFT", "MSFT"])
+        self.assertEqual(table.column("CLOSE").to_pylist(), [1.0, 2.0, 1.0, 2.0])
+
+    def test_history_to_arrow_matches_pandas_normalization(self):
+        frame = TestNormalizeFrames()._frame("AAPL", "America/New_York", [10, 20])
+        table = history_to_arrow(frame)
+        expected = normalize_frames([frame])
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("TICKER").type))
+        self.assertEqual(table.column("DATE").to_pylist(), list(expected["DATE"]))
+        self.assertEqual(table.column("VOLUME").type, pa.int8())
+
+    def test_write_pandas_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            fetch_and_load_stock_data(
+                tickers=["AAPL"],
+                snowflake_conn_id="mock_conn_id",
+                table_name="PRICE_HISTORY",
+                schema="PUBLIC",
+                database="YFINANCE",
+                start_date_str="2025-04-01",
+                end_date_str="2025-04-16",
+                fetcher_strategy=FakeFetcher(),
+                arrow_native=True,
+            )
+
+class TestMergeLoad(unittest.TestCase):
+    @patch("src.yfinance_loader.copy_into_snowflake")
+    def test_stages_merges_on_natural_key_and_drops_staging(self, mock_copy):
+        conn = MagicMock()
+        cursor = conn.cursor.return_value
+        cursor.fetchone.return_value = (3, 1)
+        df = TestCopyIntoLoad()._frame(4)
+
+        report = merge_into_snowflake(
+            conn, df, "yfinance", "public", "price_history", load_timestamp="2025-04-15 00:00:00.000000"
+        )
+
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        staging_table = mock_copy.call_args.args[4]
+        self.assertTrue(staging_table.startswith("PRICE_HISTORY_STAGE_"))
+        self.assertEqual(
+            statements[0], f"CREATE TRANSIENT TABLE YFINANCE.PUBLIC.{staging_table} LIKE YFINANCE.PUBLIC.PRICE_HISTORY"
+        )
+        merge_sql = statements[1]
+        self.assertTrue(merge_sql.startswith("MERGE INTO YFINANCE.PUBLIC.PRICE_HISTORY AS tgt"))
+        self.assertIn("ON tgt.TICKER = src.TICKER AND tgt.DATE = src.DATE", merge_sql)
+        self.assertIn("WHEN MATCHED AND (tgt.CLOSE IS DISTINCT FROM src.CLOSE OR tgt.VOLUME IS DISTINCT FROM src.VOLUME)", merge_sql)
+        self.assertNotIn("tgt.LOADTIMESTAMP IS DISTINCT FROM", merge_sql)
+        self.assertIn("tgt.LOADTIMESTAMP = '2025-04-15 00:00:00.000000'::TIMESTAMP_NTZ", merge_sql)
+        self.assertIn("INSERT (DATE, CLOSE, VOLUME, TICKER, LOADTIMESTAMP)", merge_sql)
+        self.assertNotIn("load_timestamp", mock_copy.call_args.kwargs)
+        self.assertEqual(statements[2], f"DROP TABLE IF EXISTS YFINANCE.PUBLIC.{staging_table}")
+        self.assertEqual(report, {"rows_inserted": 3, "rows_updated": 1})
+
+    @patch("src.yfinance_loader.copy_into_snowflake", side_effect=RuntimeError("copy failed"))
+    def test_staging_table_dropped_when_load_fails(self, mock_copy):
+        conn = MagicMock()
+        with self.assertRaises(RuntimeError):
+            merge_into_snowflake(conn, TestCopyIntoLoad()._frame(2), "yfinance", "public", "price_history")
+        statements = [c.args[0] for c in conn.cursor.return_value.execute.call_args_list]
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(statements[1].startswith("DROP TABLE IF EXISTS YFINANCE.PUBLIC.PRICE_HISTORY_STAGE_"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file